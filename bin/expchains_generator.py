@@ -1,14 +1,128 @@
 #!/usr/bin/env python3
 # coding=utf-8
 import argparse
+import contextlib
+import csv
+import glob
+import gzip
+import hashlib
+import heapq
 import inspect
+import io
+import itertools
+import json
+import lzma
+import mmap
 import os
 import re
 import sys
-from typing import Optional
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+from operator import itemgetter
+from typing import BinaryIO, Callable, Iterable, Iterator, Mapping, NamedTuple, Optional, TextIO
+
+from lib.ExpChainsCalendar import ExpChainsCalendar
+from lib.ExpChainsManifest import ExpChainsManifest
+from lib.ExpChainsPartitioner import ExpChainsPartitioner
+from lib.ExpChainsSnapshot import ExpChainsSnapshot
+from lib.ExpChainsStore import ExpChainsStore
+from lib.ExpChainsValidator import ExpChainsValidator
 
 ILLEGAL_SYMBOL_MESSAGE = 'Illegal symbol'
 
+STDIN = '-'
+# the compressed inputs are recognized by their magic numbers, so a compressed stdin works as well
+COMPRESSION_MAGICS = {
+    b'\x1f\x8b': 'gzip',
+    b'\xfd7zXZ\x00': 'xz',
+    b'\x28\xb5\x2f\xfd': 'zstd',
+}
+
+# precompiled once, the functions below are called for every line of a multi-GB tab file
+EXPIRATION_RE = re.compile(r'(?P<y1>\d{4})(?P<m1>[A-Z])|(?P<m2>[A-Z])(?P<e>\d?)(?P<y2>\d{4})')
+LINE_SPLIT_RE = re.compile(r'(?<![\t/])\s')
+# templates which depend on the text outside of a line can't be run over a whole mapped file
+MMAP_UNSAFE_RE = re.compile(r'\\[AZ]|\(\?<[=!]')
+# a root is everything before the first whitespace of a tab file line
+ROOT_RE = re.compile(rb'[^ \t\n]*')
+ROOT_SEPARATORS = ' \t\n'
+# the analysis of literal prefixes gives up on templates with more alternatives
+MAX_LITERAL_ALTERNATIVES = 64
+# shorter literals are too frequent to jump between their occurrences faster than a template search over a buffer
+MIN_SCAN_LITERAL_LENGTH = 3
+INDEX_SUFFIX = '.idx'
+CHECKPOINT_SUFFIX = '.checkpoint'
+FINGERPRINT_CHUNK_SIZE = 1 << 20
+
+# the same exclusion lists as bin/expchains.rb compiletab uses
+EXCLUDE_FROM_TAB_OLD_RE = [
+    re.compile(r'bse_2_futures.csv'),
+    re.compile(r'cbot_2_globex_futures.csv'),
+    re.compile(r'cbot_2_mini_futures.csv'),
+    re.compile(r'cbot_2_mini_globex_futures.csv'),
+    re.compile(r'cme_2_daily_globex_futures.csv'),
+    re.compile(r'cme_2_daily_mini_futures.csv'),
+    re.compile(r'cme_2_globex_futures.csv'),
+    re.compile(r'cme_2_mini_futures.csv'),
+    re.compile(r'cme_2_mini_globex_futures.csv'),
+    re.compile(r'comex_2_daily_futures.csv'),
+    re.compile(r'comex_2_futures.csv'),
+    re.compile(r'comex_2_mini_futures.csv'),
+    re.compile(r'moex_2_futures.csv'),
+    re.compile(r'moex_iss_futures.csv'),
+    re.compile(r'multicommodity_2_futures.csv'),
+    re.compile(r'nse_2_futures.csv'),
+    re.compile(r'nymex_2_a_futures.csv'),
+    re.compile(r'nymex_2_b_futures.csv'),
+    re.compile(r'nymex_2_daily_futures.csv'),
+    re.compile(r'nymex_2_mini_futures.csv'),
+    re.compile(r'nymex_2_nohistory_futures.csv'),
+]
+EXCLUDE_FROM_TAB_NEW_RE = [
+    re.compile(r'cme_2_daily_globex_futures.csv'),
+    re.compile(r'cme_2_daily_mini_futures.csv'),
+    re.compile(r'comex_2_daily_futures.csv'),
+    re.compile(r'moex_futures.csv'),
+    re.compile(r'moex_iss_futures.csv'),
+    re.compile(r'nymex_2_daily_futures.csv'),
+]
+EXCLUDE_FROM_ICE_EXPCHAINS_OLD_RE = [
+    re.compile(r'^.*-1C$'),
+]
+EXCLUDE_FROM_ICE_EXPCHAINS_NEW_RE = [
+    re.compile(r'^JQ [A-Z][0-9][0-9]-CME$'),
+    re.compile(r'^.*-1C$'),
+]
+TAB_REMOVED_EXPIRATIONS = ('delete', 'remove')
+# the number of entries of a merged tab file sorted in memory at once
+TAB_RUN_SIZE = 1_000_000
+
+# the same dbc ticker normalization as bin/expchains.rb generate does
+DBC_TICKER_COMMON_RE = re.compile(r'(?P<root>[A-Z0-9_]+) (?P<month>[A-Z])(?P<year>[0-9]{2})(?P<session>=[0-9]+)?'
+                                  r'(?P<exchange>-[A-Z0-9]+)?')
+DBC_TICKER_WITH_DAY_RE = re.compile(r'(?P<root>[A-Z0-9_]+) (?P<year>[0-9]{2})(?P<month>[A-Z])(?P<day>[0-9]{2})?'
+                                    r'(?P<session>=[0-9]+)?(?P<exchange>-[A-Z0-9]+)?')
+# a csv line of an expchain file, a quoted empty field ("") is told apart from a missing one as Ruby CSV does
+EXPCHAIN_FIELD_RE = re.compile(r'"((?:[^"]|"")*)"|([^,]*)')
+EXPCHAIN_QUOTED_RE = re.compile(r'[,"\r\n]')
+JSON_SEPARATOR_RE = re.compile(r'[\s,:]*')
+# complete scalar items of an array, a scalar cut at the end of a buffer is not matched
+JSON_SCALARS_RE = re.compile(r'(?:[\s,]*(?:"[^"\\]*(?:\\.[^"\\]*)*"|[-+.\dEe]+|true|false|null)(?=[\s,\]]))*')
+# the size of a chunk of a symbol_info file read by the streaming parser
+JSON_CHUNK_SIZE = 1 << 16
+
+
+class ExpChainRecord(NamedTuple):
+    """
+    Tv expchains components of a tab file line (see format_to_tv_expchains()).
+    """
+    tv_symbol: str
+    dbc_symbol: str
+    rts_symbol: str
+    root: str
+    exp_date: str
+
 
 def print_result(output_file: str, result: list) -> None:
     """
@@ -16,14 +130,30 @@ def print_result(output_file: str, result: list) -> None:
     :param output_file: a file to write results, if not specified the program will write to std out
     :param result: the results to write
     """
-    result = sorted(result, key=lambda it: it[3] + it[4])
+    print_rows(output_file, ((item[3] + item[4], ','.join(map(str, item))) for item in result))
+
+
+def print_rows(output_file: str, rows: Iterable[tuple[str, str]]) -> None:
+    """
+    Sorts formatted rows by their keys and prints them to a file or std out.
+    Only the (key, line) pairs are kept in memory, the sort is stable, so rows with equal keys keep the input order.
+    :param output_file: a file to write results, if not specified the program will write to std out
+    :param rows: pairs of a sort key (root + expiration date) and a formatted csv line
+    """
+    write_rows(output_file, sorted(rows, key=itemgetter(0)))
+
+
+def write_rows(output_file: str, rows: Iterable[tuple[str, str]]) -> None:
+    """
+    Prints already sorted rows to a file or std out.
+    :param output_file: a file to write results, if not specified the program will write to std out
+    :param rows: pairs of a sort key (root + expiration date) and a formatted csv line
+    """
     if output_file == 'stdout':
-        for item in result:
-            print(','.join(map(str, item)))
+        sys.stdout.writelines(line + '\n' for _, line in rows)
     else:
         with open(output_file, 'w') as f:
-            for item in result:
-                f.write('{0}\n'.format(','.join(map(str, item))))
+            f.writelines(line + '\n' for _, line in rows)
 
 
 def format_to_tv_expchains(root: str, exp: str, exg: Optional[str], exp_date: str) -> tuple:
@@ -36,7 +166,7 @@ def format_to_tv_expchains(root: str, exp: str, exg: Optional[str], exp_date: st
     :return: a tuple of tv expchains components
     :raise ValueError: if failed to parse passed expiration date
     """
-    match = re.match(r'(?P<y1>\d{4})(?P<m1>[A-Z])|(?P<m2>[A-Z])(?P<e>\d?)(?P<y2>\d{4})', exp)  # try to parse expiration date
+    match = EXPIRATION_RE.match(exp)  # try to parse expiration date
     if not match or match.group('e'):
         if exg:
             raise ValueError('{0}: {1} "{2} {3} {4}"'.format(inspect.currentframe().f_code.co_name, ILLEGAL_SYMBOL_MESSAGE, root, exp, exp_date))
@@ -48,8 +178,7 @@ def format_to_tv_expchains(root: str, exp: str, exg: Optional[str], exp_date: st
     tv_symbol = root + month + year
     rts_symbol = 'F:{0}\\{1}{2}'.format(root, month, year[-2:])
     tv_root = root
-    exp_date = re.sub(r'/', '', exp_date)
-    exp_date = re.sub(r' ', '0', exp_date)
+    exp_date = exp_date.replace('/', '').replace(' ', '0')
     exp_date = exp_date[-4:] + exp_date[:2] + exp_date[2:4]
     return tv_symbol, dbc_symbol, rts_symbol, tv_root, exp_date
 
@@ -63,7 +192,7 @@ def parse_line(line: str) -> tuple:
     """
     try:
         # the exp_exg variable must have an expiration component and should have an exchange component
-        root, exp_exg, exp_date = re.split(r'(?<![\t/])\s', line.rstrip())
+        root, exp_exg, exp_date = LINE_SPLIT_RE.split(line.rstrip())
     except ValueError:
         raise ValueError('{0}: {1} "{2}"'.format(inspect.currentframe().f_code.co_name, ILLEGAL_SYMBOL_MESSAGE, line.rstrip()))
     exp_exg = exp_exg.split('-')
@@ -79,14 +208,30 @@ def parse(lines: list) -> list:
     :return: a list of expchains components
     :raise ValueError: if failed to parse a line or failed to format the components to tv expchains format
     """
-    result = []
+    return list(iter_parse(lines))
+
+
+def iter_parse(lines: Iterable[str]) -> Iterator[tuple]:
+    """
+    Lazy version of parse(), yields expchains components as the lines are consumed.
+    :param lines: an iterable of lines to parse
+    :return: an iterator of expchains components
+    """
     for line in lines:
         try:
-            root, exp, exg, exp_date = parse_line(line)
-            result.append(format_to_tv_expchains(root, exp, exg, exp_date))
+            yield format_to_tv_expchains(*parse_line(line))
         except ValueError as e:
             sys.stderr.write('{0} has been skipped\n'.format(e))
-    return result
+
+
+def format_rows(items: Iterable[tuple]) -> Iterator[tuple[str, str]]:
+    """
+    Formats expchains components to rows ready to sort and write.
+    :param items: an iterable of expchains components
+    :return: an iterator of pairs of a sort key (root + expiration date) and a formatted csv line
+    """
+    for item in items:
+        yield item[3] + item[4], ','.join(item)
 
 
 def search(input_file: str, regex: str) -> list:
@@ -96,35 +241,1137 @@ def search(input_file: str, regex: str) -> list:
     :param regex: a template to test
     :return: a list of matched lines
     """
-    result, pattern = [], re.compile(regex, re.MULTILINE)
-    with open(input_file, 'r') as input_file:
+    return list(iter_search(input_file, regex))
+
+
+def iter_search(input_file: str, regex: str) -> Iterator[str]:
+    """
+    Lazy version of search(), yields matched lines as the file is read.
+    :param input_file: a file to parse
+    :param regex: a template to test
+    :return: an iterator of matched lines
+    """
+    pattern_search = compile_search(regex)
+    with open_input(input_file) as input_file:
         for line in input_file:
-            if pattern.search(line):
-                if '=' in line:
-                    continue  # drop the entries with session ID
-                result.append(line)
+            if '=' not in line and pattern_search(line):  # drop the entries with session ID
+                yield line
+
+
+def compile_search(regex: str) -> Callable[[str], object]:
+    """
+    Compiles a template to a line test, which checks the literals required by the template (see required_literals())
+    with plain string operations and runs the template itself only on the lines containing them.
+    :param regex: a template to test
+    :return: a function returning a truthy value for a matched line
+    """
+    pattern_search = re.compile(regex, re.MULTILINE).search
+    anchored, literals = required_literals(regex)
+    if anchored:
+        prefixes = tuple(literals)
+        return lambda line: line.startswith(prefixes) and pattern_search(line)
+    if starts_with_literal(regex):
+        return pattern_search  # re skips to the occurrences of a literal prefix on its own
+    if len(literals) == 1:
+        literal = literals[0]
+        return lambda line: literal in line and pattern_search(line)
+    if literals:
+        literals_search = re.compile('|'.join(map(re.escape, literals))).search
+        return lambda line: literals_search(line) and pattern_search(line)
+    return pattern_search
+
+
+def get_compression(input_file: str) -> Optional[str]:
+    """
+    Detects the compression of an input file.
+    :param input_file: a file path or '-' for std in
+    :return: gzip, xz, zstd or None for an uncompressed input
+    """
+    if input_file == STDIN:
+        magic = sys.stdin.buffer.peek(6)[:6]
+    else:
+        with open(input_file, 'rb') as f:
+            magic = f.read(6)
+    return next((compression for prefix, compression in COMPRESSION_MAGICS.items() if magic.startswith(prefix)), None)
+
+
+def is_seekable(input_file: str) -> bool:
+    """
+    Checks if an input file can be mapped, split into byte ranges or indexed.
+    :param input_file: a file path or '-' for std in
+    :return: True for an uncompressed regular file
+    """
+    return input_file != STDIN and get_compression(input_file) is None
+
+
+def open_zstd(input_file: str | BinaryIO) -> BinaryIO:
+    """
+    Opens a zstd compressed input, the stdlib module is used on Python 3.14+, the zstandard package otherwise.
+    :param input_file: a file path or a binary stream
+    :return: a binary stream of decompressed data
+    :raise ValueError: if there is no zstd support
+    """
+    try:
+        from compression import zstd
+    except ImportError:
+        try:
+            import zstandard as zstd
+        except ImportError:
+            raise ValueError('{0}: zstd input requires Python 3.14+ or the zstandard package'.format(
+                inspect.currentframe().f_code.co_name))
+    return zstd.open(input_file, 'rb')
+
+
+def open_input(input_file: str) -> TextIO:
+    """
+    Opens an input file for reading lines, gzip, xz and zstd inputs are decompressed on the fly.
+    :param input_file: a file path or '-' for std in
+    :return: a text stream
+    """
+    compression = get_compression(input_file)
+    if compression is None:
+        return io.TextIOWrapper(sys.stdin.buffer) if input_file == STDIN else open(input_file, 'r')
+    source = sys.stdin.buffer if input_file == STDIN else input_file
+    if compression == 'gzip':
+        return io.TextIOWrapper(gzip.open(source, 'rb'))
+    if compression == 'xz':
+        return io.TextIOWrapper(lzma.open(source, 'rb'))
+    return io.TextIOWrapper(open_zstd(source))
+
+
+def iter_search_mmap(input_file: str, regex: str) -> Iterator[str]:
+    """
+    Memory-mapped version of iter_search(), runs a bytes template over the whole mapped file
+    and decodes only the accepted lines, the rejected ones are never copied out of the mapping.
+    Falls back to iter_search() if the template is not ASCII or depends on the text outside of a line,
+    or the input file is compressed or std in.
+    :param input_file: a file to parse
+    :param regex: a template to test
+    :return: an iterator of matched lines
+    """
+    if not is_mmap_safe(regex) or not is_seekable(input_file):
+        yield from iter_search(input_file, regex)
+        return
+    with open(input_file, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return  # an empty file can't be mapped
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield from scan_ranges(data, regex, [(0, len(data))])
+
+
+def is_mmap_safe(regex: str) -> bool:
+    """
+    Checks if a template gives the same results over a whole buffer as over separate lines.
+    A template matching an empty string isn't: a separate line matches it after its trailing newline
+    (e.g. '^$' matches any line), a buffer has the start of the next line there.
+    :param regex: a template to check
+    :return: True if the template can be run over a memory-mapped file
+    """
+    if not regex.isascii() or MMAP_UNSAFE_RE.search(regex):
+        return False
+    try:
+        return re.compile(regex, re.MULTILINE).fullmatch('') is None
+    except re.error:
+        return False  # reported by the line by line search
+
+
+def scan(data, pattern: re.Pattern, start: int, end: int) -> Iterator[str]:
+    """
+    Finds the lines of a bytes buffer which match a bytes template.
+    A match over the buffer may span several lines, so each candidate line is tested once again on its own.
+    :param data: a bytes-like buffer (bytes, mmap)
+    :param pattern: a compiled bytes template, must be compiled with re.MULTILINE
+    :param start: an offset of a line start to scan from
+    :param end: an offset to scan to, must be a line end (or the buffer end)
+    :return: an iterator of decoded matched lines
+    """
+    pattern_search, pos = pattern.search, start
+    while pos < end:
+        match = pattern_search(data, pos, end)
+        if match is None:
+            return
+        line_start = max(pos, data.rfind(b'\n', pos, match.start()) + 1)
+        line_end = data.find(b'\n', match.start(), end)
+        pos = end if line_end < 0 else line_end + 1
+        line = data[line_start:pos]
+        if b'=' not in line and pattern_search(line):  # drop the entries with session ID
+            yield line.decode()
+
+
+def scan_literals(data, pattern: re.Pattern, literals: list[bytes], start: int, end: int) -> Iterator[str]:
+    """
+    Finds the lines of a bytes buffer which match a bytes template, jumps between the occurrences of the literals
+    required by the template with bytes.find() and tests only the lines containing them.
+    :param data: a bytes-like buffer (bytes, mmap)
+    :param pattern: a compiled bytes template, must be compiled with re.MULTILINE
+    :param literals: the literals one of which any match of the template contains (see required_literals())
+    :param start: an offset of a line start to scan from
+    :param end: an offset to scan to, must be a line end (or the buffer end)
+    :return: an iterator of decoded matched lines
+    """
+    pattern_search, find, pos = pattern.search, data.find, start
+    occurrences = [find(literal, pos, end) for literal in literals]
+    while pos < end:
+        found = [occurrence for occurrence in occurrences if occurrence >= 0]
+        if not found:
+            return
+        candidate = min(found)
+        line_start = max(pos, data.rfind(b'\n', pos, candidate) + 1)
+        line_end = find(b'\n', candidate, end)
+        pos = end if line_end < 0 else line_end + 1
+        line = data[line_start:pos]
+        if b'=' not in line and pattern_search(line):  # drop the entries with session ID
+            yield line.decode()
+        occurrences = [find(literal, pos, end) if 0 <= occurrence < pos else occurrence
+                       for literal, occurrence in zip(literals, occurrences)]
+
+
+def stream(input_file: str, regex: str, use_mmap: bool = False, use_index: bool = False) -> Iterator[tuple[str, str]]:
+    """
+    Filters, parses and formats the lines of a file in a single pass.
+    Neither matched lines nor parsed components are materialised, only the ready to write rows are yielded.
+    :param input_file: a file to parse
+    :param regex: a template to test
+    :param use_mmap: scan the memory-mapped file with a bytes template (see iter_search_mmap())
+    :param use_index: read only the lines of the matching roots (see iter_search_indexed())
+    :return: an iterator of pairs of a sort key (root + expiration date) and a formatted csv line
+    """
+    return format_rows(iter_parse(iter_lines(input_file, regex, use_mmap, use_index)))
+
+
+def iter_lines(input_file: str, regex: str, use_mmap: bool = False, use_index: bool = False) -> Iterator[str]:
+    """
+    Selects a scanner and yields matched lines.
+    :param input_file: a file to parse
+    :param regex: a template to test
+    :param use_mmap: scan the memory-mapped file with a bytes template (see iter_search_mmap())
+    :param use_index: read only the lines of the matching roots (see iter_search_indexed())
+    :return: an iterator of matched lines
+    """
+    if use_index:
+        return iter_search_indexed(input_file, regex)
+    if use_mmap:
+        return iter_search_mmap(input_file, regex)
+    return iter_search(input_file, regex)
+
+
+def iter_records(input_file: str = 'ExpChains.tab', regex: str = '', use_mmap: bool = False,
+                 use_index: bool = False) -> Iterator[ExpChainRecord]:
+    """
+    Library API, lazily yields the tv expchains records of a tab file without formatting them to text.
+    The records come in the file order, unlike the sorted output of the command line tool.
+    :param input_file: a file to parse, may be compressed or '-' for std in (see open_input())
+    :param regex: a template to test, all the lines are parsed by default
+    :param use_mmap: scan the memory-mapped file with a bytes template (see iter_search_mmap())
+    :param use_index: read only the lines of the matching roots (see iter_search_indexed())
+    :return: an iterator of records, the illegal lines are reported to std err and skipped
+    """
+    return map(ExpChainRecord._make, iter_parse(iter_lines(input_file, regex, use_mmap, use_index)))
+
+
+def to_array(records: Iterable[tuple]) -> tuple:
+    """
+    Library API, packs tv expchains records to a NumPy structured array for vectorised access.
+    The array has the tv_symbol, dbc_symbol, rts_symbol (fixed width unicode), root (int32 code of the root
+    category) and exp_date (int32, YYYYMMDD) fields, the roots are coded in the order of their first appearance.
+    :param records: an iterable of records (see iter_records())
+    :return: a structured array and an array of the root categories, indexed by the root codes
+    :raise ValueError: if an expiration date is not a number
+    """
+    import numpy  # an optional dependency of the library API only, it comes with pandas
+
+    roots = {}
+    rows = [(tv_symbol, dbc_symbol, rts_symbol, roots.setdefault(root, len(roots)), int(exp_date))
+            for tv_symbol, dbc_symbol, rts_symbol, root, exp_date in records]
+    widths = [max((len(row[i]) for row in rows), default=1) for i in range(3)]
+    dtype = numpy.dtype([('tv_symbol', 'U{0}'.format(widths[0])), ('dbc_symbol', 'U{0}'.format(widths[1])),
+                         ('rts_symbol', 'U{0}'.format(widths[2])), ('root', numpy.int32), ('exp_date', numpy.int32)])
+    return numpy.array(rows, dtype=dtype), numpy.array(list(roots), dtype='U{0}'.format(max(map(len, roots), default=1)))
+
+
+def scan_ranges(data, regex: str, ranges: Iterable[tuple[int, int]]) -> Iterator[str]:
+    """
+    Finds the lines of the byte ranges of a buffer which match a template.
+    :param data: a bytes-like buffer (bytes, mmap)
+    :param regex: a template to test
+    :param ranges: (start, end) offsets, each range starts at a line start and ends after a newline or at EOF
+    :return: an iterator of decoded matched lines
+    """
+    if is_mmap_safe(regex):
+        pattern = re.compile(regex.encode(), re.MULTILINE)
+        literals = [] if starts_with_literal(regex) else [literal.encode() for literal in required_literals(regex)[1]]
+        if literals and min(map(len, literals)) < MIN_SCAN_LITERAL_LENGTH:
+            literals = []
+        for start, end in ranges:
+            yield from scan_literals(data, pattern, literals, start, end) if literals else scan(data, pattern, start, end)
+    else:
+        pattern_search = compile_search(regex)
+        for start, end in ranges:
+            for line in io.TextIOWrapper(io.BytesIO(data[start:end])):
+                if '=' not in line and pattern_search(line):  # drop the entries with session ID
+                    yield line
+
+
+def parse_template(regex: str):
+    """
+    Parses a template by the stdlib template parser to analyse its literal parts. The parser is private
+    (re._parser and re._constants since Python 3.11), so it's imported only here and a template is not analysed,
+    i.e. it's matched without a literal prefilter, if the parser is unavailable.
+    :param regex: a template to parse
+    :return: the parsed template nodes and the module of their opcodes,
+             or None if the template is invalid or the parser is unavailable
+    """
+    try:
+        from re import _constants as sre_constants, _parser as sre_parser
+
+        return sre_parser.parse(regex, re.MULTILINE), sre_constants
+    except (ImportError, AttributeError, re.error):
+        return None
+
+
+def literal_prefixes(nodes, opcodes) -> tuple[list[str], bool]:
+    """
+    Collects the literal strings which any match of parsed template nodes must start with.
+    :param nodes: parsed template nodes (see parse_template())
+    :param opcodes: the module of the opcodes of the nodes
+    :return: a list of literal prefixes (an empty string means no literal prefix) and
+             a flag showing the nodes are fully literal, so the prefixes may be continued with the next nodes
+    :raise AttributeError: if the parser has changed
+    """
+    prefixes = ['']
+    for op, av in nodes:
+        if op is opcodes.LITERAL:
+            alternatives, complete = [chr(av)], True
+        elif op is opcodes.IN and all(item_op is opcodes.LITERAL for item_op, _ in av):
+            alternatives, complete = [chr(item_av) for _, item_av in av], True
+        elif op is opcodes.SUBPATTERN and not av[1] and not av[2]:  # a group without local flags
+            alternatives, complete = literal_prefixes(av[3], opcodes)
+        elif op is opcodes.BRANCH:
+            alternatives, complete = [], True
+            for branch in av[1]:
+                branch_prefixes, branch_complete = literal_prefixes(branch, opcodes)
+                alternatives += branch_prefixes
+                complete = complete and branch_complete
+        else:
+            return prefixes, False
+        if len(prefixes) * len(alternatives) > MAX_LITERAL_ALTERNATIVES:
+            return prefixes, False
+        prefixes = [prefix + alternative for prefix in prefixes for alternative in alternatives]
+        if not complete:
+            return prefixes, False
+    return prefixes, True
+
+
+def anchored_prefixes(regex: str) -> Optional[list[str]]:
+    """
+    Finds the literal prefixes of the lines a template anchored to a line start can match,
+    e.g. ['ES ', 'NQ ', 'YM '] for '^(ES|NQ|YM) '.
+    :param regex: a template to analyse
+    :return: a sorted list of literal prefixes, or None if the template is not anchored or has no literal prefix
+    """
+    template = parse_template(regex)
+    if template is None:
+        return None
+    parsed, opcodes = template
+    try:
+        if parsed.state.flags & re.IGNORECASE or not len(parsed):
+            return None
+        op, av = parsed[0]
+        if op is not opcodes.AT or av not in (opcodes.AT_BEGINNING, opcodes.AT_BEGINNING_STRING):
+            return None
+        prefixes, _ = literal_prefixes(parsed[1:], opcodes)
+    except AttributeError:  # a changed parser
+        return None
+    return None if '' in prefixes else sorted(set(prefixes))
+
+
+def starts_with_literal(regex: str) -> bool:
+    """
+    Checks if every match of a template starts with a literal.
+    :param regex: a template to check
+    :return: True if the template has literal prefixes
+    """
+    template = parse_template(regex)
+    try:
+        return template is not None and '' not in literal_prefixes(*template)[0]
+    except AttributeError:  # a changed parser
+        return False
+
+
+def required_literals(regex: str) -> tuple[bool, list[str]]:
+    """
+    Finds the literal strings one of which any match of a template must contain,
+    e.g. ['-CME'] for '.*-CME' or ['ES ', 'NQ '] for '(ES|NQ) ', the longest literals are preferred.
+    :param regex: a template to analyse
+    :return: a flag showing the literals are line prefixes (see anchored_prefixes()) and
+             a sorted list of literals, empty if the template doesn't require any literal
+    """
+    prefixes = anchored_prefixes(regex)
+    if prefixes:
+        return True, prefixes
+    template = parse_template(regex)
+    if template is None:
+        return False, []
+    parsed, opcodes = template
+    literals = []
+    try:
+        if parsed.state.flags & re.IGNORECASE:
+            return False, []
+        for i in range(len(parsed)):  # each node of the top-level sequence is required, try the literals from each one
+            candidates, _ = literal_prefixes(parsed[i:], opcodes)
+            if '' not in candidates and (not literals or min(map(len, candidates)) > min(map(len, literals))):
+                literals = candidates
+    except AttributeError:  # a changed parser
+        return False, []
+    return False, sorted(set(literals))
+
+
+def build_index(input_file: str) -> dict[str, list[list[int]]]:
+    """
+    Maps each root of a file to the byte ranges of its lines.
+    :param input_file: a file to index
+    :return: a mapping of a root to a list of [start, end] offsets
+    """
+    roots, root, start, pos = {}, None, 0, 0
+    match_root = ROOT_RE.match
+    with open(input_file, 'rb') as f:
+        for line in f:
+            line_root = match_root(line).group()
+            if line_root != root:
+                if root is not None:
+                    roots.setdefault(root.decode(errors='surrogateescape'), []).append([start, pos])
+                root, start = line_root, pos
+            pos += len(line)
+    if root is not None:
+        roots.setdefault(root.decode(errors='surrogateescape'), []).append([start, pos])
+    return roots
+
+
+def load_index(input_file: str) -> dict:
+    """
+    Loads the sidecar index of a file (<input_file>.idx), the index is keyed on the file size and mtime.
+    A missing or stale index is rebuilt and saved, if the index can't be saved it's used for this run only.
+    :param input_file: an indexed file
+    :return: an index, a dict with the size, mtime_ns and roots (see build_index()) keys
+    """
+    stat, index_file = os.stat(input_file), input_file + INDEX_SUFFIX
+    try:
+        with open(index_file, 'r') as f:
+            index = json.load(f)
+        if index['size'] == stat.st_size and index['mtime_ns'] == stat.st_mtime_ns:
+            return index
+    except (OSError, ValueError, KeyError, TypeError):
+        pass  # missing or broken index
+    index = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'roots': build_index(input_file)}
+    try:
+        with open(index_file + '.tmp', 'w') as f:
+            json.dump(index, f)
+        os.replace(index_file + '.tmp', index_file)
+    except OSError as e:
+        sys.stderr.write('Failed to save index {0}: {1}\n'.format(index_file, e))
+    return index
+
+
+def index_ranges(index: dict, prefixes: Iterable[str]) -> list[tuple[int, int]]:
+    """
+    Selects the byte ranges of the lines which may start with the passed prefixes.
+    :param index: an index (see load_index())
+    :param prefixes: literal prefixes of lines
+    :return: a sorted list of merged (start, end) offsets
+    """
+    roots, selected = index['roots'], set()
+    for prefix in prefixes:
+        separator = next((i for i, c in enumerate(prefix) if c in ROOT_SEPARATORS), -1)
+        if separator >= 0:
+            selected.add(prefix[:separator])  # the prefix covers the whole root
+        else:
+            selected.update(root for root in roots if root.startswith(prefix))
+    ranges = []
+    for start, end in sorted(r for root in selected for r in roots.get(root, ())):
+        if ranges and ranges[-1][1] == start:
+            ranges[-1] = ranges[-1][0], end
+        else:
+            ranges.append((start, end))
+    return ranges
+
+
+def iter_search_indexed(input_file: str, regex: str) -> Iterator[str]:
+    """
+    Indexed version of iter_search(), reads only the lines of the roots a template anchored to a line start
+    can match (e.g. '^ES ', '^(ES|NQ) '). Falls back to iter_search_mmap() if the template has no literal prefix
+    or the input file is compressed or std in.
+    :param input_file: a file to parse
+    :param regex: a template to test
+    :return: an iterator of matched lines
+    """
+    prefixes = anchored_prefixes(regex)
+    if prefixes is None or not is_seekable(input_file):
+        yield from iter_search_mmap(input_file, regex)
+        return
+    ranges = index_ranges(load_index(input_file), prefixes)
+    if not ranges:
+        return
+    with open(input_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        yield from scan_ranges(data, regex, ranges)
+
+
+def split_ranges(input_file: str, count: int) -> list[tuple[int, int]]:
+    """
+    Splits a file into newline-aligned byte ranges of about the same size.
+    :param input_file: a file to split
+    :param count: a desired number of ranges, the result may contain fewer ranges for small files
+    :return: a list of (start, end) offsets, each range starts at a line start and ends after a newline or at EOF
+    """
+    size, bounds = os.path.getsize(input_file), [0]
+    with open(input_file, 'rb') as f:
+        for i in range(1, count):
+            offset = size * i // count
+            if offset <= bounds[-1]:
+                continue
+            f.seek(offset - 1)
+            f.readline()  # moves to the start of the next line, unless the offset is a line start already
+            if bounds[-1] < f.tell() < size:
+                bounds.append(f.tell())
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def parse_range(input_file: str, regex: str, ranges: list[tuple[int, int]]) -> list[tuple[str, str]]:
+    """
+    Filters, parses and formats the lines of byte ranges of a file, a process pool task of stream_parallel().
+    :param input_file: a file to parse
+    :param regex: a template to test
+    :param ranges: (start, end) offsets, each range starts at a line start and ends after a newline or at EOF
+    :return: a list of sorted rows (see stream())
+    """
+    with open(input_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        return sorted(format_rows(iter_parse(scan_ranges(data, regex, ranges))), key=itemgetter(0))
+
+
+def stream_parallel(input_file: str, regex: str, jobs: int, use_index: bool = False) -> Iterator[tuple[str, str]]:
+    """
+    Filters, parses and formats the lines of a file in a process pool, each process scans its own byte ranges
+    of the memory-mapped file (see scan_ranges()). The sorted partial results are merged in the file order,
+    so the result is the same as the sorted stream().
+    :param input_file: a file to parse
+    :param regex: a template to test
+    :param jobs: a number of processes
+    :param use_index: split only the ranges of the matching roots (see iter_search_indexed())
+    :return: an iterator of sorted rows (see stream())
+    """
+    if os.path.getsize(input_file) == 0:
+        return iter(())  # an empty file can't be mapped
+    prefixes = anchored_prefixes(regex) if use_index else None
+    if prefixes is None:
+        tasks = [[r] for r in split_ranges(input_file, jobs * 4)]  # more ranges than jobs to balance the load
+    else:
+        ranges = index_ranges(load_index(input_file), prefixes)
+        size = max(1, -(-len(ranges) // (jobs * 4)))  # consecutive ranges a task, so the tasks keep the file order
+        tasks = [ranges[i:i + size] for i in range(0, len(ranges), size)]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(parse_range, input_file, regex, ranges) for ranges in tasks]
+        partials = [future.result() for future in futures]
+    return heapq.merge(*partials, key=itemgetter(0))
+
+
+def fingerprint(data, start: int, end: int, digest=None):
+    """
+    Continues a content fingerprint of the beginning of a buffer with a part of the buffer.
+    :param data: a bytes-like buffer (bytes, mmap)
+    :param start: an offset to start at, the end of the part the digest has been fed with
+    :param end: an offset to stop at
+    :param digest: the fingerprint of the buffer up to the start, a new one if not specified
+    :return: the digest fed with the part, its hexdigest() is the fingerprint of the buffer up to the end
+    """
+    digest = hashlib.blake2b(digest_size=16) if digest is None else digest
+    for pos in range(start, end, FINGERPRINT_CHUNK_SIZE):
+        digest.update(data[pos:min(pos + FINGERPRINT_CHUNK_SIZE, end)])
+    return digest
+
+
+def read_rows(output_file: str) -> Iterator[tuple[str, str]]:
+    """
+    Reads the rows of a previously written output file.
+    :param output_file: a file written by write_rows()
+    :return: an iterator of rows (see stream())
+    """
+    with open(output_file, 'r') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            _, root, exp_date = line.rsplit(',', 2)
+            yield root + exp_date, line
+
+
+def read_checkpoint(checkpoint_file: str) -> Optional[dict]:
+    """
+    Reads a checkpoint of the incremental mode.
+    :param checkpoint_file: a checkpoint file path
+    :return: a dict with the regex, offset and fingerprint keys, or None if the checkpoint is missing or broken
+    """
+    try:
+        with open(checkpoint_file, 'r') as f:
+            checkpoint = json.load(f)
+        return checkpoint if {'regex', 'offset', 'fingerprint'} <= checkpoint.keys() else None
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def update_incremental(input_file: str, regex: str, output_file: str) -> bool:
+    """
+    Parses only the tail appended to a file since the previous run and merges its rows into the existing output.
+    The offset and the fingerprint of the processed part are saved to <output_file>.checkpoint,
+    the whole file is rescanned if there is no checkpoint, the template has changed or the processed part
+    doesn't match the fingerprint anymore. Only complete lines are processed, an unterminated last line waits
+    for the next run.
+    :param input_file: a file to parse
+    :param regex: a template to test
+    :param output_file: a file to update
+    :return: True if only the tail has been parsed, False if the whole file has been rescanned
+    """
+    checkpoint_file = output_file + CHECKPOINT_SUFFIX
+    checkpoint = read_checkpoint(checkpoint_file)
+    with open(input_file, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        with (mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else memoryview(b'')) as data:
+            end = data.rfind(b'\n') + 1 if size else 0
+            offset = checkpoint['offset'] if checkpoint else 0
+            incremental = (checkpoint is not None and checkpoint['regex'] == regex and offset <= end
+                           and os.path.isfile(output_file))
+            if incremental:
+                # the processed part is hashed once, to check the checkpoint and then to continue with the tail
+                digest = fingerprint(data, 0, offset)
+                incremental = digest.copy().hexdigest() == checkpoint['fingerprint']
+            if not incremental:
+                offset, digest = 0, None
+            rows = sorted(format_rows(iter_parse(scan_ranges(data, regex, [(offset, end)]))), key=itemgetter(0))
+            if incremental:
+                # the old rows go first, the same way a stable sort keeps the earlier lines of the file first
+                rows = heapq.merge(read_rows(output_file), rows, key=itemgetter(0))
+            write_rows(output_file + '.tmp', rows)
+            os.replace(output_file + '.tmp', output_file)
+            checkpoint = {'regex': regex, 'offset': end,
+                          'fingerprint': fingerprint(data, offset, end, digest).hexdigest()}
+    with open(checkpoint_file, 'w') as f:
+        json.dump(checkpoint, f)
+    return incremental
+
+
+def stream_groups(input_file: str, groups: Mapping[str, str]) -> dict[str, list[tuple[str, str]]]:
+    """
+    Reads a file once and routes each line to every group whose template matches it.
+    A matched line is parsed and formatted only once, however many groups it belongs to.
+    :param input_file: a file to parse
+    :param groups: a mapping of an output file to a template to test
+    :return: a mapping of an output file to its unsorted rows (see stream())
+    """
+    searches = [(output_file, compile_search(regex)) for output_file, regex in groups.items()]
+    result = {output_file: [] for output_file in groups}
+    with open_input(input_file) as input_file:
+        for line in input_file:
+            if '=' in line:
+                continue  # drop the entries with session ID
+            matched = [output_file for output_file, pattern_search in searches if pattern_search(line)]
+            if not matched:
+                continue
+            try:
+                item = format_to_tv_expchains(*parse_line(line))
+            except ValueError as e:
+                sys.stderr.write('{0} has been skipped\n'.format(e))
+                continue
+            row = item[3] + item[4], ','.join(item)
+            for output_file in matched:
+                result[output_file].append(row)
     return result
 
 
+def read_groups(config_file: str) -> dict[str, str]:
+    """
+    Reads a groups config, a JSON object which maps an output file path to a regular expression.
+    :param config_file: a config file path
+    :return: a mapping of an output file to a template to test
+    :raise ValueError: if the config is not a JSON object of strings
+    """
+    with open(config_file, 'r') as f:
+        groups = json.load(f)
+    if not isinstance(groups, dict) or not all(isinstance(k, str) and isinstance(v, str) for k, v in groups.items()):
+        raise ValueError('{0}: {1} must be a JSON object of "<output file>": "<regex>" pairs'.format(
+            inspect.currentframe().f_code.co_name, config_file))
+    return groups
+
+
+def convert_expiration_to_tab(expiration: str) -> str:
+    """
+    Converts an expchains expiration (YYYYMMDD) to the tab file format (MM/DD/YYYY with space padding).
+    :param expiration: an expiration date, or one of the delete/remove marks
+    :return: a tab file expiration
+    """
+    if expiration in TAB_REMOVED_EXPIRATIONS:
+        return expiration
+    month, day = expiration[4:6], expiration[6:8]
+    month = ' ' + month[1:] if month[:1] == '0' else month
+    day = ' ' + day[1:] if day[:1] == '0' else day
+    return '{0}/{1}/{2}'.format(month, day, expiration[:4])
+
+
+def read_expchain(expchain_file: str) -> dict[str, str]:
+    """
+    Reads an expchain file to tab file entries, the same way as expchains.rb does:
+    a later row of a tv symbol replaces an earlier one, and a later tv symbol of a dbc symbol wins.
+    The rows with an empty expiration are skipped.
+    :param expchain_file: an expchain file (see print_result())
+    :return: a mapping of a dbc symbol to a tab file expiration
+    """
+    exp_chain = {}
+    with open(expchain_file, 'r', newline='') as f:
+        for row in csv.reader(f):
+            if not row:
+                continue
+            if len(row) < 5 or not row[4]:
+                print("Skip line '{0}' due empty expiration at processing {1}".format(','.join(row), expchain_file))
+            else:
+                exp_chain[row[0]] = row
+    return {row[1]: convert_expiration_to_tab(row[4]) for row in exp_chain.values()}
+
+
+def read_tabfile(tabfile: str, filters: list[re.Pattern]) -> Iterator[tuple[str, str]]:
+    """
+    Reads the entries of a tab file, skipping the dbc symbols which match any of the filters.
+    :param tabfile: a tab file, may be compressed (see open_input())
+    :param filters: templates of dbc symbols to drop
+    :return: an iterator of (dbc symbol, tab file expiration) pairs
+    """
+    with open_input(tabfile) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            dbc_symbol, expiration = line[:-10].strip(), line[-10:]
+            if not any(pattern.search(dbc_symbol) for pattern in filters):
+                yield dbc_symbol, expiration
+
+
+def write_run(entries: Mapping[str, str], run_file: str) -> str:
+    """
+    Writes tab file entries sorted by dbc symbols to a temporary run file of compile_tab().
+    :param entries: a mapping of a dbc symbol to a tab file expiration
+    :param run_file: a file to write
+    :return: the written file
+    """
+    with open(run_file, 'w') as f:
+        f.writelines('{0}\t{1}\n'.format(dbc_symbol, entries[dbc_symbol]) for dbc_symbol in sorted(entries))
+    return run_file
+
+
+def read_run(run_file: str) -> Iterator[tuple[str, str]]:
+    """
+    Reads a run file written by write_run().
+    :param run_file: a file to read
+    :return: an iterator of (dbc symbol, tab file expiration) pairs sorted by dbc symbols
+    """
+    with open(run_file, 'r') as f:
+        for line in f:
+            dbc_symbol, expiration = line.rstrip('\n').rsplit('\t', 1)
+            yield dbc_symbol, expiration
+
+
+def compile_tab(tabfile: str, path: str, merge_file: Optional[str] = None, new: bool = False) -> None:
+    """
+    Compiles a tab file from expchain files, the Python counterpart of expchains.rb compiletab.
+    Each expchain file (and each chunk of the merged tab file) is sorted on its own and spilled to a run file,
+    then the runs are k-way merged with a heap, so only one expchain file is kept in memory at once.
+    A dbc symbol of a later expchain file replaces the same symbol of earlier files and of the merged tab file.
+    :param tabfile: a tab file to write
+    :param path: an expchains directory, the csv files are searched recursively
+    :param merge_file: an old tab file to merge, its ICE symbols are filtered out
+    :param new: use the exclusion lists of the new tab file for new futures
+    """
+    with tempfile.TemporaryDirectory() as run_dir:
+        runs = []
+        if merge_file:
+            entries = {}
+            ice_filter = EXCLUDE_FROM_ICE_EXPCHAINS_NEW_RE if new else EXCLUDE_FROM_ICE_EXPCHAINS_OLD_RE
+            for dbc_symbol, expiration in read_tabfile(merge_file, ice_filter):
+                entries[dbc_symbol] = expiration
+                if len(entries) >= TAB_RUN_SIZE:
+                    runs.append(write_run(entries, os.path.join(run_dir, str(len(runs)))))
+                    entries = {}
+            runs.append(write_run(entries, os.path.join(run_dir, str(len(runs)))))
+        exclude_filter = EXCLUDE_FROM_TAB_NEW_RE if new else EXCLUDE_FROM_TAB_OLD_RE
+        for expchain_file in sorted(glob.glob(os.path.join(path, '**', '*.csv'), recursive=True)):
+            if any(pattern.search(expchain_file) for pattern in exclude_filter):
+                print('Exclude file from tab: {0}'.format(expchain_file))
+                continue
+            runs.append(write_run(read_expchain(expchain_file), os.path.join(run_dir, str(len(runs)))))
+
+        # heapq.merge() keeps the runs order for equal keys, so the last entry of a dbc symbol is the one to write
+        merged = heapq.merge(*map(read_run, runs), key=itemgetter(0))
+        with open(tabfile, 'w') as f:
+            for dbc_symbol, entries in groupby(merged, key=itemgetter(0)):
+                for _, expiration in entries:
+                    pass
+                if expiration not in TAB_REMOVED_EXPIRATIONS:
+                    f.write('{0}\t{1}\n'.format(dbc_symbol, expiration))
+
+
+def iter_json_array(symbolinfo_file: str, key: str, repeat_scalar: bool = False) -> Iterator:
+    """
+    Streams the items of an array of a top-level key of a JSON object file (the symbol_info format) without loading
+    the file: the values are decoded one by one and the values of the other keys are dropped as soon as decoded.
+    :param symbolinfo_file: a JSON file of an object
+    :param key: a top-level key
+    :param repeat_scalar: repeat a non-array value forever (for zipping with the arrays), otherwise yield it once
+    :return: an iterator of the array items
+    :raise ValueError: if the file is not a JSON object or it has no such key
+    """
+    decoder = json.JSONDecoder()
+    with open(symbolinfo_file, 'r') as f:
+        buffer, pos, eof = '', 0, False
+
+        def decode():
+            # decodes a value which is followed by something, a number at the end of the buffer may be cut
+            nonlocal buffer, pos, eof
+            while True:
+                pos = JSON_SEPARATOR_RE.match(buffer, pos).end()
+                try:
+                    value, end = decoder.raw_decode(buffer, pos)
+                    if end < len(buffer) or eof:
+                        pos = end
+                        return value
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                chunk = f.read(JSON_CHUNK_SIZE)
+                buffer, pos, eof = buffer[pos:] + chunk, 0, not chunk
+
+        def peek() -> str:
+            nonlocal buffer, pos, eof
+            while True:
+                pos = JSON_SEPARATOR_RE.match(buffer, pos).end()
+                if pos < len(buffer) or eof:
+                    return buffer[pos:pos + 1]
+                chunk = f.read(JSON_CHUNK_SIZE)
+                buffer, pos, eof = buffer[pos:] + chunk, 0, not chunk
+
+        if peek() != '{':
+            raise ValueError('{0}: {1} is not a JSON object'.format(inspect.currentframe().f_code.co_name,
+                                                                  symbolinfo_file))
+        pos += 1
+        while peek() not in ('}', ''):
+            name = decode()
+            if peek() != '[':
+                value = decode()
+                if name == key:
+                    yield from itertools.repeat(value) if repeat_scalar else (value,)
+                    return
+                continue
+            pos += 1
+            while True:
+                if name != key:
+                    pos = JSON_SCALARS_RE.match(buffer, pos).end()  # skips a run of scalars at once
+                if peek() in (']', ''):
+                    break
+                value = decode()
+                if name == key:
+                    yield value
+            pos += 1
+            if name == key:
+                return
+    raise ValueError('{0}: {1} has no {2} key'.format(inspect.currentframe().f_code.co_name, symbolinfo_file, key))
+
+
+def norm_dbc_ticker(dbc_ticker: str) -> str:
+    """
+    Normalizes the year of a dbc ticker to 4 digits, the same way as expchains.rb does.
+    :param dbc_ticker: a dbc ticker of a feed ticker, e.g. VA U08-CF
+    :return: a normalized dbc ticker, e.g. VA U2008-CF
+    """
+    match = DBC_TICKER_COMMON_RE.fullmatch(dbc_ticker)
+    if match:
+        return '{0} {1}20{2}{3}{4}'.format(match['root'], match['month'], match['year'], match['session'] or '',
+                                           match['exchange'] or '')
+    match = DBC_TICKER_WITH_DAY_RE.fullmatch(dbc_ticker)
+    if match:
+        return '{0} 20{1}{2}{3}{4}{5}'.format(match['root'], match['year'], match['month'], match['day'] or '',
+                                              match['session'] or '', match['exchange'] or '')
+    return dbc_ticker
+
+
+def iter_symbolinfo(symbolinfo_file: str) -> Iterator[list[Optional[str]]]:
+    """
+    Streams the expchain rows of a symbol_info file, the Python counterpart of expchains.rb generate_from_symbolinfo.
+    The parallel symbol, feed-ticker, expiration and root arrays are read in lockstep by a parser each,
+    so only a row of them is kept in memory.
+    :param symbolinfo_file: a symbol_info JSON file of a group
+    :return: an iterator of rows (symbol, dbc_ticker, rts_ticker, root, expiration), a missing rts ticker is None
+    """
+    for symbol, ticker, expiration, root in zip(iter_json_array(symbolinfo_file, 'symbol'),
+                                                iter_json_array(symbolinfo_file, 'feed-ticker', True),
+                                                iter_json_array(symbolinfo_file, 'expiration', True),
+                                                iter_json_array(symbolinfo_file, 'root', True)):
+        parts = ticker.split('~')
+        while parts and not parts[-1]:
+            parts.pop()  # as Ruby String#split drops the trailing empty fields
+        yield [symbol, norm_dbc_ticker(parts[0]) if parts else None, parts[2] if len(parts) > 2 else None, root,
+               '' if expiration is None else str(expiration)]
+
+
+def parse_expchain_line(line: str) -> list[Optional[str]]:
+    """
+    Parses a line of an expchain file, an empty field is None and a quoted empty one ("") is an empty string.
+    :param line: a csv line without a line break
+    :return: the fields
+    """
+    fields, pos = [], 0
+    while True:
+        match = EXPCHAIN_FIELD_RE.match(line, pos)
+        quoted, plain = match.groups()
+        fields.append(quoted.replace('""', '"') if quoted is not None else plain or None)
+        pos = match.end() + 1
+        if pos > len(line):
+            return fields
+
+
+def format_expchain_line(row: Iterable[Optional[str]]) -> str:
+    """
+    Formats a row of an expchain file the same way as Ruby CSV does: None is an empty field, an empty string and
+    a value with a separator or a quote are quoted.
+    :param row: the fields
+    :return: a csv line with a line break
+    """
+    return ','.join('' if field is None else
+                    '"{0}"'.format(field.replace('"', '""')) if not field or EXPCHAIN_QUOTED_RE.search(field) else
+                    field for field in row) + '\n'
+
+
+def read_expchain_lines(expchain_file: str) -> Iterator[list[Optional[str]]]:
+    """
+    Streams the rows of an expchain file (see parse_expchain_line()), the empty lines are skipped.
+    :param expchain_file: an expchain file (see print_result())
+    :return: an iterator of rows
+    """
+    with open(expchain_file, 'r', newline='') as f:
+        for line in f:
+            line = line.rstrip('\r\n')
+            if line:
+                yield parse_expchain_line(line)
+
+
+def expchain_sort_key(row: list[Optional[str]]) -> tuple[str, str]:
+    return row[3] or '', row[4] or ''
+
+
+def generate(symbolinfo_file: str, expchain_file: str, merge_file: Optional[str] = None) -> None:
+    """
+    Generates an expchain file from a symbol_info file, the Python counterpart of expchains.rb generate.
+    The rows of the merged file (an old expchain file, it may be the same file) are kept unless the symbol_info
+    file has their symbols, then the new rows keep the old rts tickers. The rows of the merged file with an empty
+    expiration are dropped. The merged file is sorted by root and expiration already, so it's streamed twice
+    (for the rts tickers of the new rows and for the linear merge) instead of being loaded.
+    :param symbolinfo_file: a symbol_info JSON file of a group
+    :param expchain_file: an expchain file to write
+    :param merge_file: an old expchain file
+    """
+    rows = {}
+    for row in iter_symbolinfo(symbolinfo_file):
+        rows[row[0]] = row  # a later row wins
+
+    old_rows: Iterable[list[Optional[str]]] = ()
+    if merge_file and os.path.exists(merge_file):
+        old_symbols, previous_key, is_sorted = set(), None, True
+        for row in read_expchain_lines(merge_file):
+            if len(row) < 5 or not row[4]:
+                print("Skip line '{0}' due empty expiration at processing {1}".format(
+                    ','.join(field or '' for field in row), merge_file))
+                continue
+            if row[0] in rows:
+                rows[row[0]][2] = row[2]
+            key = expchain_sort_key(row)
+            is_sorted = is_sorted and (previous_key is None or previous_key <= key) and row[0] not in old_symbols
+            old_symbols.add(row[0])
+            previous_key = key
+        old_rows = (row for row in read_expchain_lines(merge_file)
+                    if len(row) >= 5 and row[4] and row[0] not in rows)
+        if not is_sorted:
+            # not written by a generator (unsorted or with duplicate symbols, a later row of which wins)
+            old_rows = sorted({row[0]: row for row in old_rows}.values(), key=expchain_sort_key)
+
+    with open(expchain_file + '.tmp', 'w', newline='') as f:
+        f.writelines(map(format_expchain_line, heapq.merge(old_rows, sorted(rows.values(), key=expchain_sort_key),
+                                                           key=expchain_sort_key)))
+    os.replace(expchain_file + '.tmp', expchain_file)
+
+
 def parse_args():
     parser = argparse.ArgumentParser()
-    parser.add_argument('-r', '--regex', dest='regex', type=str, metavar='<regex>',
-                        help='regular expression to filtering by interested symbols', required=True)
+    filters = parser.add_mutually_exclusive_group()
+    filters.add_argument('-r', '--regex', dest='regex', type=str, metavar='<regex>',
+                         help='regular expression to filtering by interested symbols')
+    filters.add_argument('-c', '--config', dest='config_file', type=str, metavar='<config>',
+                         help='JSON file mapping output file paths to regular expressions, '
+                              'all of the groups are extracted in a single pass over the input file')
     parser.add_argument('-i', '--tab-file-path', dest='input_file', type=str, metavar='<tab-file-path>',
-                        help='input file path (default: ExpChains.tab)', default='ExpChains.tab')
+                        help='input file path, may be gzip/xz/zstd compressed (use - to read std in, '
+                             'default: ExpChains.tab)', default='ExpChains.tab')
     parser.add_argument('-o', '--out', dest='output_file', type=str, metavar='<out>',
                         help='output file path (use stdout to write in stdout, default: stdout)', default='stdout')
-    return parser.parse_args()
+    parser.add_argument('-m', '--mmap', dest='use_mmap', action='store_true',
+                        help='scan the memory-mapped input file with a bytes regular expression, '
+                             'only matched lines are decoded (always so with -j)')
+    parser.add_argument('-j', '--jobs', dest='jobs', type=int, metavar='<jobs>',
+                        help='number of processes to parse the input file in parallel with -r, the processes scan '
+                             'the memory-mapped file as with -m and only the indexed roots with -x; a compressed '
+                             'input file or std in is parsed in a single pass (default: 1, not supported with -c '
+                             'and -u)', default=1)
+    parser.add_argument('-x', '--index', dest='use_index', action='store_true',
+                        help='use the <tab-file-path>.idx sidecar index (built on the first run or if the input file '
+                             'has changed) to read only the roots of a regular expression anchored with ^')
+    parser.add_argument('-u', '--incremental', dest='incremental', action='store_true',
+                        help='parse only the lines appended since the previous run and merge them into the output '
+                             'file, the progress is saved to <out>.checkpoint (requires -r and -o <out>)')
+
+    subparsers = parser.add_subparsers(dest='command', metavar='<command>')
+    generate_parser = subparsers.add_parser('generate', help='generate an expchain file from a symbol_info file '
+                                                             '(the same as expchains.rb generate)')
+    generate_parser.add_argument('-s', '--symbolinfo', dest='symbolinfo_file', type=str, metavar='<symbolinfo>',
+                                 help='symbolinfo file path', required=True)
+    generate_parser.add_argument('-e', '--expchain', dest='expchain_file', type=str, metavar='<expchain>',
+                                 help='expchain file', required=True)
+    generate_parser.add_argument('-m', '--merge', dest='merge_expchain', type=str, metavar='<merge-expchain>',
+                                 help='old expchain file')
+    compile_parser = subparsers.add_parser('compile', help='compile a tab file from expchain files '
+                                                           '(the same as expchains.rb compiletab)')
+    compile_parser.add_argument('-t', '--tabfile', dest='tabfile', type=str, metavar='<tabfile>',
+                                help='path to new tab file', required=True)
+    compile_parser.add_argument('-p', '--path', dest='path', type=str, metavar='<expchains-path>',
+                                help='path to expchains directory', required=True)
+    compile_parser.add_argument('-m', '--merge', dest='merge_file', type=str, metavar='<merge-tabfile>',
+                                help='old tab file')
+    compile_parser.add_argument('-n', '--new', dest='new', action='store_true',
+                                help='new tab file for new futures')
+    snapshot_parser = subparsers.add_parser('snapshot', help='pack expchain files to a binary snapshot '
+                                                             '(see lib/ExpChainsSnapshot.py)')
+    snapshot_parser.add_argument('-s', '--snapshot', dest='snapshot_file', type=str, metavar='<snapshot>',
+                                 help='path to new snapshot file', required=True)
+    snapshot_parser.add_argument('-p', '--path', dest='path', type=str, metavar='<expchains-path>',
+                                 help='path to expchains directory', required=True)
+    snapshot_parser.add_argument('-c', '--check', dest='check_date', type=int, metavar='<YYYYMMDD>',
+                                 help='compare the live, front and next contracts of all roots on the date with '
+                                      'lib/ExpChainsStore.py, exits with 1 on a mismatch')
+    calendar_parser = subparsers.add_parser('calendar', help='print the contracts of all groups which expire '
+                                                             'within a date range, in date order')
+    calendar_parser.add_argument('-p', '--path', dest='path', type=str, metavar='<expchains-path>',
+                                 help='path to expchains directory (default: expchains)', default='expchains')
+    calendar_parser.add_argument('-f', '--from', dest='start', type=int, metavar='<YYYYMMDD>',
+                                 help='the first expiration date', required=True)
+    calendar_parser.add_argument('-t', '--to', dest='end', type=int, metavar='<YYYYMMDD>',
+                                 help='the last expiration date, inclusive', required=True)
+    calendar_parser.add_argument('-o', '--out', dest='calendar_file', type=str, metavar='<out>',
+                                 help='output file path (default: stdout)', default='stdout')
+    partition_parser = subparsers.add_parser('partition', help='split expchain files to <out>/<group>/<year>.csv '
+                                                               'partitions by the expiration years')
+    partition_parser.add_argument('-p', '--path', dest='path', type=str, metavar='<expchains-path>',
+                                  help='path to expchains directory (default: expchains)', default='expchains')
+    partition_parser.add_argument('-o', '--out', dest='partitions_path', type=str, metavar='<partitions-path>',
+                                  help='path to partitions directory', required=True)
+    manifest_parser = subparsers.add_parser('manifest', help='write the manifest (size, sha256, rows, max expiration '
+                                                             'of each file) of an expchains directory')
+    manifest_parser.add_argument('-p', '--path', dest='path', type=str, metavar='<expchains-path>',
+                                 help='path to expchains directory (default: expchains)', default='expchains')
+    manifest_parser.add_argument('-o', '--out', dest='manifest_file', type=str, metavar='<manifest>',
+                                 help='manifest file path (default: <expchains-path>.manifest.json)')
+    sync_parser = subparsers.add_parser('sync', help='transfer only the changed expchain files from a source '
+                                                     'by its manifest')
+    sync_parser.add_argument('-s', '--source', dest='source', type=str, metavar='<source>',
+                             help='source expchains directory path or url', required=True)
+    sync_parser.add_argument('-m', '--manifest', dest='manifest_source', type=str, metavar='<manifest>',
+                             help='source manifest path or url (default: <source>.manifest.json)')
+    sync_parser.add_argument('-p', '--path', dest='path', type=str, metavar='<expchains-path>',
+                             help='path to local expchains directory (default: expchains)', default='expchains')
+    sync_parser.add_argument('-d', '--delete', dest='delete', action='store_true',
+                             help='remove the local files which are not in the source manifest')
+    validate_parser = subparsers.add_parser('validate', help='validate expchain files, exits with 1 on errors')
+    validate_parser.add_argument('-p', '--path', dest='path', type=str, metavar='<expchains-path>',
+                                 help='path to expchains directory (default: expchains)', default='expchains')
+    validate_parser.add_argument('--cache', dest='cache_file', type=str, metavar='<cache>',
+                                 help='JSON file to cache the results of unchanged expchain files')
+    validate_parser.add_argument('-j', '--jobs', dest='validate_jobs', type=int, metavar='<jobs>',
+                                 help='number of processes (default: number of CPUs)')
+    validate_parser.add_argument('-w', '--warnings', dest='warnings', action='store_true',
+                                 help='print warnings (month code gaps, tv symbols of several groups) as well')
+
+    args = parser.parse_args()
+    if args.command is None and args.regex is None and args.config_file is None:
+        parser.error('one of the arguments -r/--regex -c/--config is required')
+    if args.jobs > 1 and args.config_file:
+        parser.error('argument -j/--jobs: not allowed with argument -c/--config, the groups are extracted in a '
+                     'single pass')
+    if args.jobs > 1 and args.incremental:
+        parser.error('argument -j/--jobs: not allowed with argument -u/--incremental')
+    return args
 
 
 def main(args):
-    if not os.path.isfile(args.input_file):
+    if args.command == 'generate':
+        generate(args.symbolinfo_file, args.expchain_file, args.merge_expchain)
+        return 0
+    if args.command == 'compile':
+        compile_tab(args.tabfile, args.path, args.merge_file, args.new)
+        return 0
+    if args.command == 'snapshot':
+        ExpChainsSnapshot.write(args.snapshot_file, args.path)
+        if args.check_date is None:
+            return 0
+        with ExpChainsSnapshot(args.snapshot_file) as snapshot:
+            # all groups stay in memory, the roots are compared in the name order, which jumps between the groups
+            store = ExpChainsStore(args.path, max_groups=len(glob.glob(os.path.join(args.path, '*.csv'))))
+            mismatches = store.mismatches(snapshot, args.check_date)
+        for mismatch in mismatches:
+            print(mismatch)
+        return 1 if mismatches else 0
+    if args.command == 'calendar':
+        with (open(args.calendar_file, 'w', newline='') if args.calendar_file != 'stdout'
+              else contextlib.nullcontext(sys.stdout)) as f:
+            ExpChainsCalendar.write(f, args.path, args.start, args.end)
+        return 0
+    if args.command == 'partition':
+        ExpChainsPartitioner.partition(args.path, args.partitions_path)
+        return 0
+    if args.command == 'manifest':
+        ExpChainsManifest.write(args.path, args.manifest_file)
+        return 0
+    if args.command == 'sync':
+        ExpChainsManifest.sync(args.source, args.path, args.manifest_source, args.delete)
+        return 0
+    if args.command == 'validate':
+        issues = ExpChainsValidator.validate(args.path, args.cache_file, args.validate_jobs)
+        errors = sum(1 for issue in issues if issue.severity == 'error')
+        for issue in issues:
+            if issue.severity == 'error' or args.warnings:
+                print(issue)
+        print('{0} errors, {1} warnings'.format(errors, len(issues) - errors))
+        return 1 if errors else 0
+
+    if args.input_file != STDIN and not os.path.isfile(args.input_file):
         print('File {0} not found. You should to specify a path to downloaded *.tab file or '
               'place it nearly this script.'.format(args.input_file))
         return 1
 
-    result = parse(search(args.input_file, args.regex))
-    print_result(args.output_file, result)
+    if args.incremental and (args.config_file or args.output_file == 'stdout'):
+        print('The incremental mode requires a regular expression and an output file.')
+        return 1
+    if args.incremental and not is_seekable(args.input_file):
+        print('The incremental mode requires an uncompressed input file.')
+        return 1
+
+    if args.config_file:
+        for output_file, rows in stream_groups(args.input_file, read_groups(args.config_file)).items():
+            print_rows(output_file, rows)
+    elif args.incremental:
+        update_incremental(args.input_file, args.regex, args.output_file)
+    elif args.jobs > 1 and is_seekable(args.input_file):
+        write_rows(args.output_file, stream_parallel(args.input_file, args.regex, args.jobs, args.use_index))
+    else:
+        print_rows(args.output_file, stream(args.input_file, args.regex, args.use_mmap, args.use_index))
 
     return 0
 
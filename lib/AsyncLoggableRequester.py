@@ -0,0 +1,136 @@
+import asyncio
+import copy
+import json
+from typing import Mapping
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from lib.ConsoleOutput import ConsoleOutput
+from lib.LoggableRequester import LoggableRequester
+from lib.RateLimiter import RateLimiter
+from lib.Retryer import Retryer
+
+
+class AsyncLoggableRequester:
+    """
+    An asyncio counterpart of LoggableRequester for fanning out requests with asyncio.gather:
+    at most limit_per_host requests to a host (and limit requests overall) are sent at once, the other ones wait
+    for a free slot before their timeout starts, a failed request is retried as by Retryer. Every request is logged by a whole line when it's done.
+    Use it as an async context manager (or close it) within the event loop of the requests.
+    """
+
+    Methods = LoggableRequester.Methods
+
+    def __init__(self, logger: ConsoleOutput = None, retries = 3, timeout = 5, delay = 0, limit_per_host = 4, limit = 100,
+                 rate_limiter: RateLimiter = None):
+        """
+        :param logger:
+        :param retries:
+        :param timeout: the total timeout of a request attempt, it starts once the request has a free slot
+        :param delay:
+        :param limit_per_host: the number of concurrent requests to a host
+        :param limit: the number of concurrent requests to all hosts
+        :param rate_limiter: a limiter of the requests to a host, every attempt takes a token
+        """
+        # protected non-static variables
+        self._logger = ConsoleOutput(type(self).__name__) if logger is None else logger
+        self._retries = retries
+        self._timeout = timeout
+        self._delay = delay
+        self._msg = None
+        self._limit_per_host = limit_per_host
+        self._limit = limit
+        self._session: aiohttp.ClientSession | None = None
+        self._rate_limiter = rate_limiter
+        # the slots are shared by the copies made by message()
+        self._slots = asyncio.Semaphore(limit)
+        self._host_slots: dict[str, asyncio.Semaphore] = {}
+
+    async def __aenter__(self) -> "AsyncLoggableRequester":
+        self._get_session()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            # the slots keep the requests within the connector limits, so a timed request never waits for a connection
+            connector = aiohttp.TCPConnector(limit=self._limit, limit_per_host=self._limit_per_host)
+            self._session = aiohttp.ClientSession(connector=connector,
+                                                  timeout=aiohttp.ClientTimeout(total=self._timeout))
+        return self._session
+
+    def message(self, msg: str) -> "AsyncLoggableRequester":
+        """
+        :param msg: the log message of the next request
+        :return: a copy of the requester sharing its connections, so concurrent requests keep their messages
+        """
+        self._get_session()
+        requester = copy.copy(self)
+        requester._msg = msg
+        return requester
+
+    async def request(self, method: Methods, url: str, headers: Mapping[str, str] = None, data: dict[str, str] = None) -> aiohttp.ClientResponse:
+        """
+
+        :param method:
+        :param url:
+        :param headers:
+        :param data:
+        :return: a released response with the body read, so text() and json() are still available
+        :raise RequestException:
+        """
+        payload = {
+            "data": data if method is AsyncLoggableRequester.Methods.POST else None,
+            "params": data if method is AsyncLoggableRequester.Methods.GET else None
+        }
+        msg = f"[{method.value}] Requesting to {url}... " if self._msg is None else self._msg
+        return await (Retryer[aiohttp.ClientResponse](self._logger, self._retries, self._delay)
+                      .apply_async(self.__request, msg, method.value, url, headers, payload['data'], payload['params']))
+
+    async def __request(self, msg: str, method: str, url, headers, data, params) -> aiohttp.ClientResponse:
+        """
+
+        :param msg:
+        :param method:
+        :param url:
+        :param headers:
+        :param data:
+        :param params:
+        :return:
+        :raise aiohttp.ClientError:
+        :raise TimeoutError:
+        """
+        host_slots = self._host_slots.setdefault(urlsplit(url).netloc, asyncio.Semaphore(self._limit_per_host))
+        try:
+            async with self._slots, host_slots:
+                if self._rate_limiter is not None:
+                    await self._rate_limiter.acquire_async(url)
+                async with self._get_session().request(method, url, headers=headers, data=data, params=params) as response:
+                    await response.read()
+            response.raise_for_status()
+            self._logger.info(msg + ConsoleOutput.Foreground.REGULAR_GREEN + "OK")
+            return response
+        except TimeoutError as e:
+            self._logger.info(msg + ConsoleOutput.Foreground.REGULAR_RED + "FAIL")
+            self._logger.error(f"Timeout of {self._timeout} sec has expired")
+            raise e
+        except aiohttp.ClientResponseError as e:
+            self._logger.info(msg + ConsoleOutput.Foreground.REGULAR_RED + "FAIL")
+            status = f"{e.status} - {e.message}"
+            try:
+                self._logger.error(f"{status}: {json.loads(await response.text())['Message']}")
+            except (ValueError, KeyError, TypeError):
+                self._logger.error(status)
+            raise e
+        except aiohttp.ClientError as e:
+            self._logger.info(msg + ConsoleOutput.Foreground.REGULAR_RED + "FAIL")
+            self._logger.error(e)
+            raise e
@@ -0,0 +1,115 @@
+from typing import Iterable, NamedTuple, Optional, Sequence
+
+
+class ContinuousContracts:
+    """
+    Continuous contracts of many roots over a date range, computed at once with NumPy:
+    the contracts of all roots are sorted by (root, expiration) into one array of keys and the active contract
+    of every (root, date) pair is found by a single searchsorted call. The result takes roots * dates int32 cells.
+    """
+
+    class Roll(NamedTuple):
+        root: str
+        date: int  # YYYYMMDD, the first date of the new contract
+        old_symbol: Optional[str]
+        new_symbol: Optional[str]
+
+    def __init__(self, contracts: Iterable[Sequence], start: int, end: int, order: int = 1, roll_days: int = 0):
+        """
+        :param contracts: the contracts of the roots (ExpChain.Contract or ExpChainRecord), the symbol, root and
+            expiration (YYYYMMDD) are at 0, 3 and 4, the first row of a symbol of a root wins
+        :param start: the first date (YYYYMMDD)
+        :param end: the last date (YYYYMMDD), inclusive
+        :param order: 1 for the front contract, 2 for the next one, etc.
+        :param roll_days: a contract is rolled that many calendar days before its expiration
+        :raise ValueError: if an expiration date is not a number or the order is not positive
+        """
+        super().__init__()
+        if order < 1:
+            raise ValueError(f"{type(self).__name__}: the order {order} is not positive")
+        import numpy  # an optional dependency, it comes with pandas
+
+        rows = {}
+        for row in contracts:
+            rows.setdefault((row[3], row[0]), int(row[4]))
+        roots, root_codes = numpy.unique(numpy.array([root for root, _ in rows], dtype=object).astype(str),
+                                         return_inverse=True)
+        expirations = ContinuousContracts.to_days(numpy.fromiter(rows.values(), dtype=numpy.int64, count=len(rows)))
+        expirations -= roll_days
+        sorted_rows = numpy.lexsort((expirations, root_codes))
+        root_codes, expirations = root_codes[sorted_rows], expirations[sorted_rows]
+        symbols = numpy.array([symbol for _, symbol in rows], dtype=object)[sorted_rows]
+
+        # the keys of a root never reach the next root: (root code << 32) + days since the earliest expiration
+        first_day = int(expirations.min()) if len(expirations) else 0
+        keys = (root_codes.astype(numpy.int64) << 32) + (expirations - first_day)
+        root_ends = numpy.searchsorted(root_codes, numpy.arange(len(roots)), side='right')
+        days = numpy.arange(ContinuousContracts.to_days(numpy.array([start]))[0],
+                            ContinuousContracts.to_days(numpy.array([end]))[0] + 1, dtype=numpy.int64)
+        queries = (numpy.arange(len(roots), dtype=numpy.int64)[:, None] << 32) + numpy.clip(days - first_day, 0, None)
+        positions = numpy.searchsorted(keys, queries, side='left') + (order - 1)
+
+        # protected non-static variables
+        self._roots: list[str] = roots.tolist()
+        self._root_codes = {root: i for i, root in enumerate(self._roots)}
+        self._symbols = symbols
+        self._dates = ContinuousContracts.to_yyyymmdd(days)
+        self._active = numpy.where(positions < root_ends[:, None], positions, -1).astype(numpy.int32)
+
+    @property
+    def roots(self) -> list[str]:
+        return list(self._roots)
+
+    @property
+    def dates(self):
+        """
+        :return: a NumPy int32 array of the dates (YYYYMMDD)
+        """
+        return self._dates
+
+    def symbols(self, root: str) -> list[Optional[str]]:
+        """
+        :param root: a root
+        :return: the active contract symbol of the root on each date, None if all contracts have expired
+        :raise KeyError: if there is no such root
+        """
+        return [self._symbols[i] if i >= 0 else None for i in self._active[self._root_codes[root]].tolist()]
+
+    def rolls(self) -> list[Roll]:
+        """
+        :return: the rolls of all roots within the date range, sorted by root and date
+        """
+        import numpy
+
+        root_codes, columns = numpy.nonzero(self._active[:, 1:] != self._active[:, :-1])
+        old, new = self._active[root_codes, columns], self._active[root_codes, columns + 1]
+        return [ContinuousContracts.Roll(self._roots[root_code], int(self._dates[column + 1]),
+                                         self._symbols[old_i] if old_i >= 0 else None,
+                                         self._symbols[new_i] if new_i >= 0 else None)
+                for root_code, column, old_i, new_i in zip(root_codes.tolist(), columns.tolist(),
+                                                           old.tolist(), new.tolist())]
+
+    @staticmethod
+    def to_days(dates):
+        """
+        :param dates: a NumPy integer array of dates (YYYYMMDD)
+        :return: a NumPy int64 array of the days since 1970-01-01
+        """
+        import numpy
+
+        months = (dates // 10000 - 1970) * 12 + dates // 100 % 100 - 1
+        return (months.astype('datetime64[M]').astype('datetime64[D]') + (dates % 100 - 1)).astype(numpy.int64)
+
+    @staticmethod
+    def to_yyyymmdd(days):
+        """
+        :param days: a NumPy integer array of the days since 1970-01-01
+        :return: a NumPy int32 array of dates (YYYYMMDD)
+        """
+        import numpy
+
+        dates = days.astype('datetime64[D]')
+        months = dates.astype('datetime64[M]')
+        month_numbers = months.astype(numpy.int64)
+        return ((month_numbers // 12 + 1970) * 10000 + (month_numbers % 12 + 1) * 100 +
+                (dates - months.astype('datetime64[D]')).astype(numpy.int64) + 1).astype(numpy.int32)
@@ -0,0 +1,123 @@
+import bisect
+import csv
+import glob
+import os
+from array import array
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+
+class ExpChain:
+    """
+    Expiration chains of a group (an expchains/*.csv file) indexed by roots
+    """
+
+    class Contract(NamedTuple):
+        symbol: str
+        dbc_ticker: str
+        rts_ticker: str
+        root: str
+        expiration: int  # YYYYMMDD
+
+    def __init__(self, name: str, contracts: Iterable[Contract]):
+        super().__init__()
+        # protected non-static variables
+        self._name = name
+        self._contracts: dict[str, list[ExpChain.Contract]] = {}
+        for contract in contracts:
+            self._contracts.setdefault(contract.root, []).append(contract)
+        self._expirations: dict[str, array] = {}
+        for root, root_contracts in self._contracts.items():
+            root_contracts.sort(key=lambda it: it.expiration)
+            self._expirations[root] = array('i', (contract.expiration for contract in root_contracts))
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def roots(self) -> list[str]:
+        return list(self._contracts)
+
+    def contracts(self, root: str) -> list[Contract]:
+        """
+        :param root: a root
+        :return: all contracts of the root sorted by expiration
+        """
+        return list(self._contracts.get(root, ()))
+
+    def live(self, root: str, date: int) -> list[Contract]:
+        """
+        :param root: a root
+        :param date: a date (YYYYMMDD)
+        :return: the contracts of the root which are not expired on the date, sorted by expiration
+        """
+        return self._contracts.get(root, [])[self._position(root, date):]
+
+    def front(self, root: str, date: int) -> Optional[Contract]:
+        """
+        :param root: a root
+        :param date: a date (YYYYMMDD)
+        :return: the nearest contract of the root which is not expired on the date
+        """
+        return self._at(root, self._position(root, date))
+
+    def next(self, root: str, date: int) -> Optional[Contract]:
+        """
+        :param root: a root
+        :param date: a date (YYYYMMDD)
+        :return: the contract following the front one on the date
+        """
+        return self._at(root, self._position(root, date) + 1)
+
+    def _position(self, root: str, date: int) -> int:
+        return bisect.bisect_left(self._expirations.get(root, ()), date)
+
+    def _at(self, root: str, position: int) -> Optional[Contract]:
+        contracts = self._contracts.get(root, ())
+        return contracts[position] if position < len(contracts) else None
+
+    @staticmethod
+    def read_rows(path: str) -> Iterator[list[str]]:
+        """
+        Reads the rows of an expchain file (symbol, dbc_ticker, rts_ticker, root, expiration).
+        :param path: an expchain file path
+        :return: an iterator of rows
+        """
+        with open(path, 'r', newline='') as f:
+            yield from csv.reader(f)
+
+    @staticmethod
+    def group_name(path: str) -> str:
+        return os.path.splitext(os.path.basename(path))[0]
+
+    @classmethod
+    def read_years(cls, path: str, first_year: int, last_year: Optional[int] = None) -> "ExpChain":
+        """
+        Reads the partitions of a group within a year range, a partition is a <path>/<year>.csv file
+        written by ExpChainsPartitioner. The missing years are skipped.
+        :param path: a group partitions directory
+        :param first_year: the first expiration year
+        :param last_year: the last expiration year, inclusive, all later years if not specified
+        :return: an expiration chain named after the directory
+        """
+        years = sorted(int(year) for year in map(cls.group_name, glob.glob(os.path.join(path, '*.csv')))
+                       if year.isdigit())
+        contracts = []
+        for year in years:
+            if first_year <= year and (last_year is None or year <= last_year):
+                contracts.extend(ExpChain.Contract(row[0], row[1], row[2], row[3], int(row[4]))
+                                 for row in cls.read_rows(os.path.join(path, '{0}.csv'.format(year))))
+        return cls(os.path.basename(os.path.normpath(path)), contracts)
+
+    @classmethod
+    def read(cls, path: str) -> "ExpChain":
+        """
+        Reads an expchain file the same way as expchains.rb does, a later row of a symbol replaces an earlier one.
+        The rows without a numeric expiration (empty, delete, remove) are skipped.
+        :param path: an expchain file path
+        :return: an expiration chain named after the file
+        """
+        contracts = {}
+        for row in cls.read_rows(path):
+            if len(row) >= 5 and row[4].isdigit():
+                contracts[row[0]] = ExpChain.Contract(row[0], row[1], row[2], row[3], int(row[4]))  # a later row wins
+        return cls(cls.group_name(path), contracts.values())
@@ -0,0 +1,65 @@
+import csv
+import glob
+import heapq
+import os
+from itertools import groupby
+from operator import itemgetter
+from typing import Iterator, TextIO
+
+from lib.ExpChain import ExpChain
+
+
+class ExpChainsCalendar:
+    """
+    The expiration calendar of an expchains directory: the contracts of all groups which expire within a date range,
+    in date order. An expchain file is sorted by root and expiration, so the sorted streams of the roots and files
+    are k-way merged and only the rows of the range are kept in memory.
+    """
+
+    @staticmethod
+    def iter_expiring(path: str, start: int, end: int) -> Iterator[tuple[int, str, list[str]]]:
+        """
+        Streams the rows of an expchain file which expire within a date range, in date order.
+        Only the matching part of each root run is kept and the runs are heap-merged.
+        The rows without a numeric expiration are skipped.
+        :param path: an expchain file path
+        :param start: the first date (YYYYMMDD)
+        :param end: the last date (YYYYMMDD), inclusive
+        :return: an iterator of (expiration, group, row)
+        """
+        group = ExpChain.group_name(path)
+        runs = []
+        for _, rows in groupby((row for row in ExpChain.read_rows(path) if len(row) >= 5), key=itemgetter(3)):
+            run = [(expiration, group, row) for row in rows if row[4].isdigit()
+                   for expiration in (int(row[4]),) if start <= expiration <= end]
+            if run:
+                run.sort(key=itemgetter(0))  # a no-op pass over an already sorted run
+                runs.append(run)
+        yield from heapq.merge(*runs, key=itemgetter(0))
+
+    @staticmethod
+    def iter(path: str, start: int, end: int) -> Iterator[tuple[int, str, list[str]]]:
+        """
+        Streams the rows of all groups which expire within a date range, in date order
+        (the groups of the same date are in the name order).
+        :param path: an expchains directory
+        :param start: the first date (YYYYMMDD)
+        :param end: the last date (YYYYMMDD), inclusive
+        :return: an iterator of (expiration, group, row)
+        """
+        return heapq.merge(*(ExpChainsCalendar.iter_expiring(expchain_file, start, end)
+                             for expchain_file in sorted(glob.glob(os.path.join(path, '*.csv')))), key=itemgetter(0))
+
+    @staticmethod
+    def write(f: TextIO, path: str, start: int, end: int) -> None:
+        """
+        Writes the expiration calendar of a date range as csv lines: expiration, group, symbol, dbc_ticker,
+        rts_ticker, root.
+        :param f: a text file opened with newline=''
+        :param path: an expchains directory
+        :param start: the first date (YYYYMMDD)
+        :param end: the last date (YYYYMMDD), inclusive
+        """
+        writer = csv.writer(f, lineterminator='\n')
+        for expiration, group, row in ExpChainsCalendar.iter(path, start, end):
+            writer.writerow([expiration, group] + row[:4])
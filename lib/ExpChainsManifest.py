@@ -0,0 +1,160 @@
+import csv
+import glob
+import hashlib
+import io
+import json
+import os
+from typing import Optional
+
+
+class ExpChainsManifest:
+    """
+    The manifest of an expchains directory, a JSON object mapping the file names to their size, sha256,
+    row count and max expiration. A mirror is updated by the manifests (see sync()): only the missing and changed
+    files are transferred.
+    """
+
+    SUFFIX = '.manifest.json'
+    VERSION = 1
+
+    @staticmethod
+    def entry(path: str, previous: Optional[dict] = None) -> dict:
+        """
+        Describes an expchain file for a manifest.
+        :param path: an expchain file path
+        :param previous: the previous entry of the file, its rows and max_expiration are reused if the file has
+            the same content
+        :return: a dict with the size, sha256, rows and max_expiration (YYYYMMDD or None) keys
+        """
+        with open(path, 'rb') as f:
+            data = f.read()
+        entry = {'size': len(data), 'sha256': hashlib.sha256(data).hexdigest()}
+        if previous and previous.get('sha256') == entry['sha256']:
+            entry.update(rows=previous['rows'], max_expiration=previous['max_expiration'])
+            return entry
+        rows = list(csv.reader(io.StringIO(data.decode())))
+        expirations = [int(row[4]) for row in rows if len(row) >= 5 and row[4].isdigit()]
+        entry.update(rows=len(rows), max_expiration=max(expirations, default=None))
+        return entry
+
+    @staticmethod
+    def read(source: str) -> dict:
+        """
+        Reads a manifest (see write()).
+        :param source: a manifest file path or an http(s) url
+        :return: a manifest, a dict with the version and files keys
+        :raise ValueError: if the manifest has an unsupported version
+        """
+        manifest = json.loads(ExpChainsManifest.read_source(source))
+        if manifest.get('version') != ExpChainsManifest.VERSION:
+            raise ValueError(f"ExpChainsManifest: {source} is not a manifest v{ExpChainsManifest.VERSION}")
+        return manifest
+
+    @staticmethod
+    def write(path: str, manifest_file: Optional[str] = None) -> dict:
+        """
+        Writes the manifest of an expchains directory. The output is stable, so the manifests of the same files
+        are equal byte by byte.
+        :param path: an expchains directory
+        :param manifest_file: a manifest file path (default: <path>.manifest.json)
+        :return: the manifest
+        """
+        manifest_file = manifest_file or os.path.normpath(path) + ExpChainsManifest.SUFFIX
+        try:
+            previous = ExpChainsManifest.read(manifest_file)['files']
+        except (OSError, ValueError, KeyError):
+            previous = {}  # missing or broken manifest
+        manifest = {'version': ExpChainsManifest.VERSION, 'files': {
+            os.path.basename(expchain_file): ExpChainsManifest.entry(expchain_file,
+                                                                     previous.get(os.path.basename(expchain_file)))
+            for expchain_file in sorted(glob.glob(os.path.join(path, '*.csv')))}}
+        ExpChainsManifest._dump(manifest, manifest_file)
+        return manifest
+
+    @staticmethod
+    def read_source(source: str) -> bytes:
+        """
+        Reads a file of a sync source.
+        :param source: a file path or an http(s) url
+        :return: the file content
+        :raise OSError: if failed to read a file
+        :raise RequestException: if failed to download a file
+        """
+        if source.startswith(('http://', 'https://')):
+            from lib.LoggableRequester import LoggableRequester  # the requests package is needed only to sync by http
+
+            return LoggableRequester(timeout=60).request(LoggableRequester.Methods.GET, source).content
+        with open(source, 'rb') as f:
+            return f.read()
+
+    @staticmethod
+    def local_file(name: str, path: str) -> str:
+        """
+        Checks a file name of a source manifest, it must be a plain file name within the local directory.
+        :param name: a file name of a manifest
+        :param path: a local expchains directory
+        :return: the local file path
+        :raise ValueError: if the name is absolute, has a directory or resolves outside the directory
+        """
+        root = os.path.realpath(path)
+        expchain_file = os.path.realpath(os.path.join(root, name))
+        if not name or os.path.isabs(name) or os.path.basename(name) != name or '/' in name or name in ('.', '..') or \
+                os.path.dirname(expchain_file) != root:
+            raise ValueError(f"ExpChainsManifest: unsafe file name {name!r} in the manifest")
+        return expchain_file
+
+    @staticmethod
+    def sync(source: str, path: str, manifest_source: Optional[str] = None, delete: bool = False) -> list[str]:
+        """
+        Updates a local expchains directory from a source by the manifests: only the files which are missing or
+        have another sha256 are transferred. A transferred file is verified and replaced atomically,
+        then the manifest of the local files is saved: the source entries and, without delete, the entries of the
+        local files the source doesn't have.
+        :param source: a source expchains directory path or url
+        :param path: a local expchains directory
+        :param manifest_source: the source manifest path or url (default: <source>.manifest.json)
+        :param delete: remove the local files which are not in the source manifest
+        :return: the names of the transferred and removed files
+        :raise ValueError: if a transferred file doesn't match the source manifest or a file name of the manifest
+            is unsafe
+        """
+        source = source.rstrip('/')
+        remote = ExpChainsManifest.read(manifest_source or source + ExpChainsManifest.SUFFIX)
+        # all names are checked before any change
+        expchain_files = {name: ExpChainsManifest.local_file(name, path) for name in remote['files']}
+        os.makedirs(path, exist_ok=True)
+        local = {os.path.basename(expchain_file): expchain_file
+                 for expchain_file in glob.glob(os.path.join(path, '*.csv'))}
+        changed = []
+        for name, entry in sorted(remote['files'].items()):
+            if name in local:
+                with open(local[name], 'rb') as f:
+                    if os.path.getsize(local[name]) == entry['size'] and \
+                            hashlib.file_digest(f, 'sha256').hexdigest() == entry['sha256']:
+                        continue
+            print('Sync {0}'.format(name))
+            data = ExpChainsManifest.read_source(source + '/' + name)
+            if hashlib.sha256(data).hexdigest() != entry['sha256']:
+                raise ValueError(f"ExpChainsManifest: {name} does not match the manifest")
+            expchain_file = expchain_files[name]
+            with open(expchain_file + '.tmp', 'wb') as f:
+                f.write(data)
+            os.replace(expchain_file + '.tmp', expchain_file)
+            changed.append(name)
+        manifest = {'version': ExpChainsManifest.VERSION, 'files': dict(remote['files'])}
+        for name in sorted(set(local) - set(remote['files'])):
+            if delete:
+                print('Remove {0}'.format(name))
+                os.remove(local[name])
+                changed.append(name)
+            else:
+                manifest['files'][name] = ExpChainsManifest.entry(local[name])
+        ExpChainsManifest._dump(manifest, os.path.normpath(path) + ExpChainsManifest.SUFFIX)
+        return changed
+
+    @staticmethod
+    def _dump(manifest: dict, manifest_file: str) -> None:
+        with open(manifest_file + '.tmp', 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+            f.write('\n')
+        os.replace(manifest_file + '.tmp', manifest_file)
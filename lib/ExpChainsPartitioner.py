@@ -0,0 +1,62 @@
+import csv
+import glob
+import io
+import os
+
+from lib.ExpChain import ExpChain
+
+
+class ExpChainsPartitioner:
+    """
+    Splits expchain files to the <output_path>/<group>/<year>.csv partitions by the expiration years,
+    the partitions of a group are read by ExpChain.read_years().
+    """
+
+    @staticmethod
+    def partition_file(path: str, output_path: str) -> dict[int, int]:
+        """
+        Splits an expchain file by the expiration years. The rows are read the same way as ExpChain.read() does,
+        so a symbol is in a single partition, the rows without a numeric expiration are not partitioned.
+        The unchanged partitions are not rewritten, the partitions of the years the file no longer has are removed.
+        :param path: an expchain file path
+        :param output_path: a partitions directory
+        :return: the number of rows of each year
+        """
+        rows = {}
+        for row in ExpChain.read_rows(path):
+            if len(row) >= 5 and row[4].isdigit():
+                rows[row[0]] = row  # a later row wins
+        years = {}
+        for row in rows.values():
+            years.setdefault(int(row[4][:4]), []).append(row)
+
+        group_path = os.path.join(output_path, ExpChain.group_name(path))
+        os.makedirs(group_path, exist_ok=True)
+        for year, year_rows in years.items():
+            content = io.StringIO()
+            csv.writer(content, lineterminator='\n').writerows(year_rows)
+            partition_file = os.path.join(group_path, '{0}.csv'.format(year))
+            try:
+                with open(partition_file, 'r', newline='') as f:
+                    if f.read() == content.getvalue():
+                        continue
+            except OSError:
+                pass  # a new partition
+            with open(partition_file + '.tmp', 'w', newline='') as f:
+                f.write(content.getvalue())
+            os.replace(partition_file + '.tmp', partition_file)
+        for partition_file in glob.glob(os.path.join(group_path, '*.csv')):
+            year = ExpChain.group_name(partition_file)
+            if not year.isdigit() or int(year) not in years:
+                os.remove(partition_file)
+        return {year: len(year_rows) for year, year_rows in sorted(years.items())}
+
+    @staticmethod
+    def partition(path: str, output_path: str) -> None:
+        """
+        Splits all expchain files of a directory by the expiration years (see partition_file()).
+        :param path: an expchains directory
+        :param output_path: a partitions directory
+        """
+        for expchain_file in sorted(glob.glob(os.path.join(path, '*.csv'))):
+            ExpChainsPartitioner.partition_file(expchain_file, output_path)
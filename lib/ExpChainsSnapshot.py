@@ -0,0 +1,329 @@
+import bisect
+import glob
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import Iterable, Optional
+
+from lib.ExpChain import ExpChain
+
+
+class ExpChainsSnapshot:
+    """
+    A packed binary snapshot of an expchains directory, opened with mmap, so the pages are shared between processes
+    and nothing is parsed on open.
+
+    Layout (little-endian): the header (magic, version, sections count), the table of (offset, length) pairs of
+    the sections, then the 8-byte aligned sections. The rows are sorted by root and expiration, the roots are
+    dictionary-encoded by the sorted root names table and the root index holds the first row of each root.
+    A string table is a pair of sections: uint32 offsets (count + 1) and a utf-8 blob.
+    The tv symbols, dbc and rts tickers have a hash table each (open addressing by crc32 with linear probing,
+    uint32 row + 1 in a slot, 0 in an empty one), so a translation in any direction is an O(1) lookup.
+    """
+
+    MAGIC = b'EXPCSNAP'
+    VERSION = 2
+
+    SYMBOL = 'symbol'
+    DBC_TICKER = 'dbc_ticker'
+    RTS_TICKER = 'rts_ticker'
+
+    class Sections:
+        ROOT_NAMES, ROOT_NAMES_BLOB = 0, 1
+        EXCHANGE_NAMES, EXCHANGE_NAMES_BLOB = 2, 3
+        GROUP_NAMES, GROUP_NAMES_BLOB = 4, 5
+        ROOT_INDEX = 6  # uint32, roots count + 1
+        EXPIRATIONS = 7  # int32 YYYYMMDD, a row each
+        EXCHANGES = 8  # uint16 codes of the exchange names, a row each
+        GROUPS = 9  # uint16 codes of the group names, a row each
+        SYMBOLS, SYMBOLS_BLOB = 10, 11
+        DBC_TICKERS, DBC_TICKERS_BLOB = 12, 13
+        RTS_TICKERS, RTS_TICKERS_BLOB = 14, 15
+        SYMBOLS_HASH, DBC_TICKERS_HASH, RTS_TICKERS_HASH = 16, 17, 18  # uint32, a power of two slots each
+        COUNT = 19
+
+    # private static consts
+    __HEADER = struct.Struct('<8sII')
+    __SECTION = struct.Struct('<QQ')
+    __TYPECODES = {
+        Sections.ROOT_NAMES: 'I', Sections.EXCHANGE_NAMES: 'I', Sections.GROUP_NAMES: 'I',
+        Sections.ROOT_INDEX: 'I', Sections.EXPIRATIONS: 'i', Sections.EXCHANGES: 'H', Sections.GROUPS: 'H',
+        Sections.SYMBOLS: 'I', Sections.DBC_TICKERS: 'I', Sections.RTS_TICKERS: 'I',
+        Sections.SYMBOLS_HASH: 'I', Sections.DBC_TICKERS_HASH: 'I', Sections.RTS_TICKERS_HASH: 'I',
+    }
+    # a kind of symbols: the string table and the hash table sections
+    __KINDS = {
+        SYMBOL: (Sections.SYMBOLS, Sections.SYMBOLS_HASH),
+        DBC_TICKER: (Sections.DBC_TICKERS, Sections.DBC_TICKERS_HASH),
+        RTS_TICKER: (Sections.RTS_TICKERS, Sections.RTS_TICKERS_HASH),
+    }
+
+    def __init__(self, path: str):
+        """
+        Opens a snapshot.
+        :param path: a snapshot file path
+        :raise ValueError: if the file is not a snapshot of the supported version
+        """
+        super().__init__()
+        if sys.byteorder != 'little':
+            raise ValueError(f"{type(self).__name__}: big-endian platforms are not supported")
+        # protected non-static variables
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        magic, version, count = ExpChainsSnapshot.__HEADER.unpack_from(self._mmap)
+        if magic != ExpChainsSnapshot.MAGIC or version != ExpChainsSnapshot.VERSION:
+            self.close()
+            raise ValueError(f"{type(self).__name__}: {path} is not an expchains snapshot v{ExpChainsSnapshot.VERSION}")
+        self._sections = []
+        for i in range(count):
+            offset, length = ExpChainsSnapshot.__SECTION.unpack_from(
+                self._mmap, ExpChainsSnapshot.__HEADER.size + i * ExpChainsSnapshot.__SECTION.size)
+            section = self._view[offset:offset + length]
+            typecode = ExpChainsSnapshot.__TYPECODES.get(i)
+            self._sections.append(section.cast(typecode) if typecode else section)
+
+    def __enter__(self) -> "ExpChainsSnapshot":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for section in getattr(self, '_sections', ()):
+            section.release()
+        self._sections = []
+        self._view.release()
+        self._mmap.close()
+
+    def __len__(self) -> int:
+        return len(self._sections[ExpChainsSnapshot.Sections.EXPIRATIONS])
+
+    def roots(self) -> list[str]:
+        return [self._string(ExpChainsSnapshot.Sections.ROOT_NAMES, i) for i in range(self._roots_count())]
+
+    def contracts(self, root: str) -> list[ExpChain.Contract]:
+        """
+        :param root: a root
+        :return: all contracts of the root of all groups sorted by expiration, a row each
+        """
+        start, end = self._root_rows(root)
+        return [self._contract(row, root) for row in range(start, end)]
+
+    def live(self, root: str, date: int) -> list[ExpChain.Contract]:
+        """
+        :param root: a root
+        :param date: a date (YYYYMMDD)
+        :return: the contracts of the root which are not expired on the date, sorted by expiration,
+            a symbol of several groups is returned once
+        """
+        start, end = self._root_rows(root)
+        contracts = {}
+        for row in range(self._position(start, end, date), end):
+            contracts.setdefault(self._string(ExpChainsSnapshot.Sections.SYMBOLS, row), row)
+        return [self._contract(row, root) for row in contracts.values()]
+
+    def front(self, root: str, date: int) -> Optional[ExpChain.Contract]:
+        """
+        :param root: a root
+        :param date: a date (YYYYMMDD)
+        :return: the nearest contract of the root which is not expired on the date
+        """
+        contracts = self._nearest(root, date)
+        return contracts[0] if contracts else None
+
+    def next(self, root: str, date: int) -> Optional[ExpChain.Contract]:
+        """
+        :param root: a root
+        :param date: a date (YYYYMMDD)
+        :return: the contract following the front one on the date
+        """
+        contracts = self._nearest(root, date)
+        return contracts[1] if len(contracts) > 1 else None
+
+    def exchange(self, row: int) -> str:
+        return self._string(ExpChainsSnapshot.Sections.EXCHANGE_NAMES, self._sections[ExpChainsSnapshot.Sections.EXCHANGES][row])
+
+    def group(self, row: int) -> str:
+        return self._string(ExpChainsSnapshot.Sections.GROUP_NAMES, self._sections[ExpChainsSnapshot.Sections.GROUPS][row])
+
+    def find(self, value: str, kind: str = SYMBOL) -> Optional[ExpChain.Contract]:
+        """
+        :param value: a tv symbol, a dbc ticker or an rts ticker
+        :param kind: the kind of the value: SYMBOL, DBC_TICKER or RTS_TICKER
+        :return: the contract of the value, the first one in the snapshot order if several groups have it
+        :raise KeyError: if the kind is unknown
+        """
+        row = self._find_row(value, *ExpChainsSnapshot.__KINDS[kind])
+        return self._contract(row, self._root_of(row)) if row is not None else None
+
+    def translate(self, values: Iterable[str], source: str = SYMBOL, target: str = DBC_TICKER) -> list[Optional[str]]:
+        """
+        Translates symbols in batch, e.g. the dbc tickers of a list of tv symbols.
+        :param values: the symbols to translate
+        :param source: the kind of the symbols: SYMBOL, DBC_TICKER or RTS_TICKER
+        :param target: the kind of the result: SYMBOL, DBC_TICKER or RTS_TICKER
+        :return: the translated symbols in the order of the values, None for an unknown one
+        :raise KeyError: if a kind is unknown
+        """
+        source_section, hash_section = ExpChainsSnapshot.__KINDS[source]
+        target_section = ExpChainsSnapshot.__KINDS[target][0]
+        find_row, string = self._find_row, self._string
+        result = []
+        for value in values:
+            row = find_row(value, source_section, hash_section)
+            result.append(string(target_section, row) if row is not None else None)
+        return result
+
+    def _find_row(self, value: str, section: int, hash_section: int) -> Optional[int]:
+        offsets, blob, slots = self._sections[section], self._sections[section + 1], self._sections[hash_section]
+        key = value.encode()
+        mask = len(slots) - 1
+        i = zlib.crc32(key) & mask
+        while row := slots[i]:
+            if blob[offsets[row - 1]:offsets[row]] == key:
+                return row - 1
+            i = (i + 1) & mask
+        return None
+
+    def _root_of(self, row: int) -> str:
+        root_index = self._sections[ExpChainsSnapshot.Sections.ROOT_INDEX]
+        return self._string(ExpChainsSnapshot.Sections.ROOT_NAMES, bisect.bisect_right(root_index, row) - 1)
+
+    def _roots_count(self) -> int:
+        return len(self._sections[ExpChainsSnapshot.Sections.ROOT_INDEX]) - 1
+
+    def _root_rows(self, root: str) -> tuple[int, int]:
+        # a binary search over the sorted root names table, only the probed names are decoded
+        low, high = 0, self._roots_count()
+        while low < high:
+            middle = (low + high) // 2
+            if self._string(ExpChainsSnapshot.Sections.ROOT_NAMES, middle) < root:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self._roots_count() or self._string(ExpChainsSnapshot.Sections.ROOT_NAMES, low) != root:
+            return 0, 0
+        root_index = self._sections[ExpChainsSnapshot.Sections.ROOT_INDEX]
+        return root_index[low], root_index[low + 1]
+
+    def _nearest(self, root: str, date: int) -> list[ExpChain.Contract]:
+        # a symbol of several groups has a row each, the rows of the same symbol are skipped
+        start, end = self._root_rows(root)
+        contracts = {}
+        for row in range(self._position(start, end, date), end):
+            contracts.setdefault(self._string(ExpChainsSnapshot.Sections.SYMBOLS, row), row)
+            if len(contracts) == 2:
+                break
+        return [self._contract(row, root) for row in contracts.values()]
+
+    def _position(self, start: int, end: int, date: int) -> int:
+        return bisect.bisect_left(self._sections[ExpChainsSnapshot.Sections.EXPIRATIONS], date, start, end)
+
+    def _string(self, section: int, i: int) -> str:
+        offsets, blob = self._sections[section], self._sections[section + 1]
+        return bytes(blob[offsets[i]:offsets[i + 1]]).decode()
+
+    def _contract(self, row: int, root: str) -> ExpChain.Contract:
+        return ExpChain.Contract(self._string(ExpChainsSnapshot.Sections.SYMBOLS, row),
+                                 self._string(ExpChainsSnapshot.Sections.DBC_TICKERS, row),
+                                 self._string(ExpChainsSnapshot.Sections.RTS_TICKERS, row),
+                                 root, self._sections[ExpChainsSnapshot.Sections.EXPIRATIONS][row])
+
+    @staticmethod
+    def exchange_of(dbc_ticker: str) -> str:
+        """
+        :param dbc_ticker: a dbc ticker, e.g. VA U2008-CF
+        :return: the exchange suffix of the ticker (CF), or an empty string
+        """
+        _, separator, exchange = dbc_ticker.rpartition('-')
+        return exchange if separator and ' ' not in exchange else ''
+
+    @staticmethod
+    def write(path: str, expchains_path: str = 'expchains') -> int:
+        """
+        Packs all expchain files of a directory to a snapshot, the groups are read with ExpChain.read(),
+        so a symbol found in several groups has a row for each of them.
+        :param path: a snapshot file path, the file is replaced atomically
+        :param expchains_path: an expchains directory
+        :return: the number of packed rows
+        """
+        groups, rows = [], []
+        for expchain_file in sorted(glob.glob(os.path.join(expchains_path, '*.csv'))):
+            exp_chain = ExpChain.read(expchain_file)
+            for root in exp_chain.roots():
+                rows.extend((contract, len(groups)) for contract in exp_chain.contracts(root))
+            groups.append(exp_chain.name)
+        rows.sort(key=lambda it: (it[0].root, it[0].expiration, it[1], it[0].symbol))
+
+        roots = sorted({contract.root for contract, _ in rows})
+        exchanges = sorted({ExpChainsSnapshot.exchange_of(contract.dbc_ticker) for contract, _ in rows})
+        root_codes = {root: i for i, root in enumerate(roots)}
+        exchange_codes = {exchange: i for i, exchange in enumerate(exchanges)}
+        root_index = array('I', [0] * (len(roots) + 1))
+        for contract, _ in rows:
+            root_index[root_codes[contract.root] + 1] += 1
+        for i in range(len(roots)):
+            root_index[i + 1] += root_index[i]
+
+        sections = [None] * ExpChainsSnapshot.Sections.COUNT
+        for section, strings in ((ExpChainsSnapshot.Sections.ROOT_NAMES, roots),
+                                 (ExpChainsSnapshot.Sections.EXCHANGE_NAMES, exchanges),
+                                 (ExpChainsSnapshot.Sections.GROUP_NAMES, groups),
+                                 (ExpChainsSnapshot.Sections.SYMBOLS, [contract.symbol for contract, _ in rows]),
+                                 (ExpChainsSnapshot.Sections.DBC_TICKERS, [contract.dbc_ticker for contract, _ in rows]),
+                                 (ExpChainsSnapshot.Sections.RTS_TICKERS, [contract.rts_ticker for contract, _ in rows])):
+            sections[section], sections[section + 1] = ExpChainsSnapshot._pack_strings(strings)
+        for section, strings in ((ExpChainsSnapshot.Sections.SYMBOLS_HASH, [contract.symbol for contract, _ in rows]),
+                                 (ExpChainsSnapshot.Sections.DBC_TICKERS_HASH, [contract.dbc_ticker for contract, _ in rows]),
+                                 (ExpChainsSnapshot.Sections.RTS_TICKERS_HASH, [contract.rts_ticker for contract, _ in rows])):
+            sections[section] = ExpChainsSnapshot._pack_hash(strings)
+        sections[ExpChainsSnapshot.Sections.ROOT_INDEX] = root_index.tobytes()
+        sections[ExpChainsSnapshot.Sections.EXPIRATIONS] = array('i', (contract.expiration for contract, _ in rows)).tobytes()
+        sections[ExpChainsSnapshot.Sections.EXCHANGES] = array('H', (exchange_codes[ExpChainsSnapshot.exchange_of(contract.dbc_ticker)] for contract, _ in rows)).tobytes()
+        sections[ExpChainsSnapshot.Sections.GROUPS] = array('H', (group for _, group in rows)).tobytes()
+
+        with open(path + '.tmp', 'wb') as f:
+            f.write(ExpChainsSnapshot.__HEADER.pack(ExpChainsSnapshot.MAGIC, ExpChainsSnapshot.VERSION, len(sections)))
+            offset = ExpChainsSnapshot.__HEADER.size + ExpChainsSnapshot.__SECTION.size * len(sections)
+            table = []
+            for section in sections:
+                offset += -offset % 8
+                table.append((offset, len(section)))
+                offset += len(section)
+            for section_offset, length in table:
+                f.write(ExpChainsSnapshot.__SECTION.pack(section_offset, length))
+            for (section_offset, _), section in zip(table, sections):
+                f.write(b'\0' * (section_offset - f.tell()))
+                f.write(section)
+        os.replace(path + '.tmp', path)
+        return len(rows)
+
+    @staticmethod
+    def _pack_strings(strings: list[str]) -> tuple[bytes, bytes]:
+        encoded = [string.encode() for string in strings]
+        offsets = array('I', [0])
+        for string in encoded:
+            offsets.append(offsets[-1] + len(string))
+        return offsets.tobytes(), b''.join(encoded)
+
+    @staticmethod
+    def _pack_hash(strings: list[str]) -> bytes:
+        # the load factor is at most 0.5, an empty string is not indexed, the first row of a string wins
+        encoded = [string.encode() for string in strings]
+        mask = (1 << max(1, (2 * len(encoded)).bit_length())) - 1
+        slots = array('I', bytes(4 * (mask + 1)))
+        for row, key in enumerate(encoded):
+            if not key:
+                continue
+            i = zlib.crc32(key) & mask
+            while slots[i]:
+                if encoded[slots[i] - 1] == key:
+                    break
+                i = (i + 1) & mask
+            else:
+                slots[i] = row + 1
+        return slots.tobytes()
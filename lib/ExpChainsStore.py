@@ -0,0 +1,127 @@
+import glob
+import itertools
+import os
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from lib.ExpChain import ExpChain
+from lib.ExpChainsSnapshot import ExpChainsSnapshot
+
+
+class ExpChainsStore:
+    """
+    Lazily loaded expiration chains of an expchains directory.
+    The groups are read on the first request and at most max_groups of them stay in memory,
+    the least recently used group is evicted first. Not thread-safe.
+    """
+
+    def __init__(self, path: str = 'expchains', max_groups: int = 16):
+        super().__init__()
+        # protected non-static variables
+        self._path = path
+        self._max_groups = max_groups
+        self._groups: OrderedDict[str, ExpChain] = OrderedDict()
+        self._roots: Optional[dict[str, list[str]]] = None
+
+    def groups(self) -> list[str]:
+        """
+        :return: the names of all groups of the directory
+        """
+        return sorted(ExpChain.group_name(path) for path in glob.glob(os.path.join(self._path, '*.csv')))
+
+    def group(self, name: str) -> ExpChain:
+        """
+        :param name: a group name (an expchain file name without extension)
+        :return: the expiration chains of the group
+        :raise OSError: if there is no such group
+        """
+        exp_chain = self._groups.get(name)
+        if exp_chain is None:
+            exp_chain = ExpChain.read(os.path.join(self._path, name + '.csv'))
+            self._groups[name] = exp_chain
+            if len(self._groups) > self._max_groups:
+                self._groups.popitem(last=False)
+        else:
+            self._groups.move_to_end(name)
+        return exp_chain
+
+    def groups_of(self, root: str) -> list[str]:
+        """
+        Finds the groups of a root. The first call reads the roots of all files once, the contracts are not kept.
+        :param root: a root
+        :return: the names of the groups containing the root
+        """
+        if self._roots is None:
+            self._roots = {}
+            for name in self.groups():
+                roots = {row[3] for row in ExpChain.read_rows(os.path.join(self._path, name + '.csv')) if len(row) >= 5}
+                for group_root in roots:
+                    self._roots.setdefault(group_root, []).append(name)
+        return list(self._roots.get(root, ()))
+
+    def live(self, root: str, date: int, group: Optional[str] = None) -> list[ExpChain.Contract]:
+        """
+        :param root: a root
+        :param date: a date (YYYYMMDD)
+        :param group: a group name, all groups of the root are searched if not specified
+        :return: the contracts of the root which are not expired on the date, sorted by expiration
+        """
+        return self._unique((name, contract) for name in ([group] if group else self.groups_of(root))
+                            for contract in self.group(name).live(root, date))
+
+    def front(self, root: str, date: int, group: Optional[str] = None) -> Optional[ExpChain.Contract]:
+        """
+        :param root: a root
+        :param date: a date (YYYYMMDD)
+        :param group: a group name, all groups of the root are searched if not specified
+        :return: the nearest contract of the root which is not expired on the date
+        """
+        contracts = self._nearest(root, date, group)
+        return contracts[0] if contracts else None
+
+    def next(self, root: str, date: int, group: Optional[str] = None) -> Optional[ExpChain.Contract]:
+        """
+        :param root: a root
+        :param date: a date (YYYYMMDD)
+        :param group: a group name, all groups of the root are searched if not specified
+        :return: the contract following the front one on the date
+        """
+        contracts = self._nearest(root, date, group)
+        return contracts[1] if len(contracts) > 1 else None
+
+    def _nearest(self, root: str, date: int, group: Optional[str]) -> list[ExpChain.Contract]:
+        # the contracts of each group up to the expiration of its next one are enough to find the overall front and
+        # next ones, the contracts expiring on the same date are all kept as the tie is broken by group and symbol
+        candidates = []
+        for name in [group] if group else self.groups_of(root):
+            live = self.group(name).live(root, date)
+            last = live[1].expiration if len(live) > 1 else None
+            candidates.extend((name, contract) for contract in itertools.takewhile(
+                lambda it: last is None or it.expiration <= last, live))
+        return self._unique(candidates)[:2]
+
+    def mismatches(self, snapshot: ExpChainsSnapshot, date: int) -> list[str]:
+        """
+        Compares the live, front and next contracts of all roots of a snapshot with the ones of the store.
+        :param snapshot: a snapshot of the same expchains directory
+        :param date: a date (YYYYMMDD)
+        :return: the descriptions of the mismatches
+        """
+        mismatches = []
+        for root in snapshot.roots():
+            for name, store_value, snapshot_value in (('live', self.live(root, date), snapshot.live(root, date)),
+                                                      ('front', self.front(root, date), snapshot.front(root, date)),
+                                                      ('next', self.next(root, date), snapshot.next(root, date))):
+                if store_value != snapshot_value:
+                    mismatches.append('{0} of {1} on {2}: {3} in the store, {4} in the snapshot'.format(
+                        name, root, date, store_value, snapshot_value))
+        return mismatches
+
+    @staticmethod
+    def _unique(contracts: Iterable[tuple[str, ExpChain.Contract]]) -> list[ExpChain.Contract]:
+        # a symbol of several groups is kept once, by its earliest expiration, then by the group file name as
+        # ExpChainsSnapshot orders its rows
+        unique = {}
+        for _, contract in sorted(contracts, key=lambda it: (it[1].expiration, it[0] + '.csv', it[1].symbol)):
+            unique.setdefault(contract.symbol, contract)
+        return list(unique.values())
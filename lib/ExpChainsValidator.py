@@ -0,0 +1,181 @@
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from lib.ExpChain import ExpChain
+
+
+class ExpChainsValidator:
+    """
+    Validates the expchain files of a directory in parallel. The results are cached by the file content hashes,
+    so only the changed files are validated again.
+    """
+
+    class Issue(NamedTuple):
+        """
+        A problem of an expchain file found by validate_file(), an error fails the validation.
+        """
+        group: str
+        line: int  # 0 if the issue is not bound to a line
+        severity: str  # error or warning
+        message: str
+
+        def __str__(self) -> str:
+            if self.line:
+                return '{0}.csv:{1}: {2}: {3}'.format(self.group, self.line, self.severity, self.message)
+            return '{0}.csv: {1}: {2}'.format(self.group, self.severity, self.message)
+
+    # the cached results of validate() are dropped on a version change, increase it on a change of the checks
+    CACHE_VERSION = 1
+
+    # private static consts
+    __MONTH_CODES = 'FGHJKMNQUVXZ'
+    # a tv symbol of a contract: root, month code and year
+    __CONTRACT_MONTH_RE = re.compile(r'(?P<month>[FGHJKMNQUVXZ])(?P<year>\d{4})$')
+    __FIELDS = ('symbol', 'dbc_ticker', 'rts_ticker', 'root', 'expiration')
+    # the fields a tab file is compiled from, the other ones may be empty
+    __REQUIRED_FIELDS = ('symbol', 'dbc_ticker', 'expiration')
+    # the expirations which remove a symbol from a tab file
+    __REMOVED_EXPIRATIONS = ('delete', 'remove')
+
+    @staticmethod
+    def month_gaps(root: str, symbols: Iterable[str]) -> Iterator[str]:
+        """
+        Finds the gaps of a root chain: the months of the root cycle (all months the root has contracts in)
+        which are missing between two consecutive contracts.
+        :param root: a root
+        :param symbols: the tv symbols of the root contracts
+        :return: an iterator of gap descriptions
+        """
+        month_codes = ExpChainsValidator.__MONTH_CODES
+        months = sorted({int(match['year']) * 12 + month_codes.index(match['month'])
+                         for match in (ExpChainsValidator.__CONTRACT_MONTH_RE.match(symbol, len(root))
+                                       for symbol in symbols) if match})
+        cycle = {month % 12 for month in months}
+        for previous, month in zip(months, months[1:]):
+            missing = [m for m in range(previous + 1, month) if m % 12 in cycle]
+            if missing:
+                yield 'month code gap in {0} between {0}{1}{2} and {0}{3}{4}: {5}'.format(
+                    root, month_codes[previous % 12], previous // 12, month_codes[month % 12], month // 12,
+                    ' '.join('{0}{1}{2}'.format(root, month_codes[m % 12], m // 12) for m in missing))
+
+    @staticmethod
+    def validate_file(path: str) -> tuple[list[Issue], list[str]]:
+        """
+        Validates an expchain file. The errors are malformed rows, empty symbols, dbc tickers or expirations,
+        malformed expirations, duplicate tv symbols and the rows out of the root and expiration order,
+        the warnings are empty roots and the month code gaps (see month_gaps()).
+        :param path: an expchain file path
+        :return: the issues and the tv symbols of the file
+        """
+        fields = ExpChainsValidator.__FIELDS
+        Issue = ExpChainsValidator.Issue
+        group = ExpChain.group_name(path)
+        issues, lines = [], {}
+        previous_root, previous_expiration, root_symbols = None, None, []
+
+        def check_root_end():
+            if previous_root is not None:
+                issues.extend(Issue(group, 0, 'warning', gap)
+                              for gap in ExpChainsValidator.month_gaps(previous_root, root_symbols))
+
+        for line, row in enumerate(ExpChain.read_rows(path), 1):
+            if len(row) != len(fields):
+                issues.append(Issue(group, line, 'error', 'malformed row: {0} fields instead of {1}'.format(
+                    len(row), len(fields))))
+                continue
+            symbol, _, _, root, expiration = row
+            for name, value in zip(fields, row):
+                if not value and name in ExpChainsValidator.__REQUIRED_FIELDS:
+                    issues.append(Issue(group, line, 'error', 'empty ' + name))
+            if not root:
+                issues.append(Issue(group, line, 'warning', 'empty root'))
+            if expiration and expiration not in ExpChainsValidator.__REMOVED_EXPIRATIONS and not (
+                    len(expiration) == 8 and expiration.isdigit() and
+                    1 <= int(expiration[4:6]) <= 12 and 1 <= int(expiration[6:]) <= 31):
+                issues.append(Issue(group, line, 'error', "malformed expiration '{0}'".format(expiration)))
+            if symbol in lines:
+                issues.append(Issue(group, line, 'error', 'duplicate tv symbol {0} (line {1})'.format(
+                    symbol, lines[symbol])))
+            else:
+                lines[symbol] = line
+
+            if previous_root is not None and root < previous_root:
+                issues.append(Issue(group, line, 'error', 'root {0} is out of order (after {1})'.format(
+                    root, previous_root)))
+            if root != previous_root:
+                check_root_end()
+                previous_root, previous_expiration, root_symbols = root, None, []
+            root_symbols.append(symbol)
+            if expiration.isdigit():
+                if previous_expiration is not None and expiration < previous_expiration:
+                    issues.append(Issue(group, line, 'error', 'expiration {0} of {1} is out of order '
+                                                              '(after {2})'.format(expiration, symbol,
+                                                                                   previous_expiration)))
+                previous_expiration = expiration
+        check_root_end()
+        return issues, list(lines)
+
+    @staticmethod
+    def validate(path: str, cache_file: Optional[str] = None, jobs: Optional[int] = None) -> list[Issue]:
+        """
+        Validates all expchain files of a directory in parallel (see validate_file()) and warns about
+        the tv symbols found in several files.
+        :param path: an expchains directory
+        :param cache_file: a JSON cache file, no cache if not specified
+        :param jobs: the number of processes (default: the number of CPUs)
+        :return: the issues of all files sorted by group and line
+        """
+        cache = {}
+        if cache_file:
+            try:
+                with open(cache_file, 'r') as f:
+                    cache = json.load(f)
+                if cache.get('version') != ExpChainsValidator.CACHE_VERSION:
+                    cache = {}
+            except (OSError, ValueError):
+                pass  # missing or broken cache
+        cached_files = cache.get('files', {})
+
+        files, stale = {}, []
+        for expchain_file in sorted(glob.glob(os.path.join(path, '*.csv'))):
+            group = ExpChain.group_name(expchain_file)
+            with open(expchain_file, 'rb') as f:
+                digest = hashlib.file_digest(f, 'blake2b').hexdigest()
+            entry = cached_files.get(group)
+            if entry and entry['hash'] == digest:
+                files[group] = entry
+            else:
+                files[group] = {'hash': digest}
+                stale.append(expchain_file)
+        if stale:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                for expchain_file, (issues, symbols) in zip(stale, executor.map(ExpChainsValidator.validate_file,
+                                                                                stale)):
+                    files[ExpChain.group_name(expchain_file)].update(issues=issues, symbols=symbols)
+
+        if cache_file and stale:
+            try:
+                with open(cache_file + '.tmp', 'w') as f:
+                    json.dump({'version': ExpChainsValidator.CACHE_VERSION, 'files': files}, f)
+                os.replace(cache_file + '.tmp', cache_file)
+            except OSError as e:
+                sys.stderr.write('Failed to save validation cache {0}: {1}\n'.format(cache_file, e))
+
+        issues, symbol_groups = [], {}
+        for group, entry in files.items():
+            issues.extend(map(ExpChainsValidator.Issue._make, entry['issues']))
+            for symbol in entry['symbols']:
+                symbol_groups.setdefault(symbol, []).append(group)
+        for symbol, groups in symbol_groups.items():
+            if len(groups) > 1:
+                issues.append(ExpChainsValidator.Issue(groups[-1], 0, 'warning',
+                                                       'tv symbol {0} is in several groups: {1}'.format(
+                                                           symbol, ', '.join(groups))))
+        issues.sort(key=lambda it: (it.group, it.line))
+        return issues
@@ -0,0 +1,125 @@
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from requests import Response
+
+
+class HttpCache:
+    """
+    An on-disk cache of GET responses revalidated by their ETag / Last-Modified validators.
+    A new response is kept pending until commit(), which is called once the data built from it is stored,
+    so a failed run doesn't leave validators which would make the next run skip the download.
+    The cache is active (see activate()) while main.py runs a generator, which passes it to the requests of
+    its static files: LoggableRequester.request(..., cache=HttpCache.active()).
+    """
+
+    # private static consts
+    __ACTIVE: ContextVar[Optional["HttpCache"]] = ContextVar('HttpCache.active', default=None)
+    __PENDING_SUFFIX = '.pending'
+
+    def __init__(self, path: str):
+        """
+        :param path: a cache directory, it's created on the first store()
+        """
+        super().__init__()
+        # protected non-static variables
+        self._path = path
+        self._pending: list[str] = []
+
+    def headers(self, url: str) -> dict[str, str]:
+        """
+        :param url: a full url including the query
+        :return: the conditional request headers of the committed response of the url, empty if there is no one
+        """
+        meta_file, body_file = self._files(url)
+        try:
+            with open(meta_file, 'r') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not os.path.exists(body_file):
+            return {}
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def load(self, url: str) -> bytes:
+        """
+        :param url: a full url including the query
+        :return: the committed body of the url
+        :raise OSError: if there is no cached body
+        """
+        with open(self._files(url)[1], 'rb') as f:
+            return f.read()
+
+    def copy(self, url: str, destination: str) -> None:
+        """
+        :param url: a full url including the query
+        :param destination: a file to copy the committed body of the url to
+        :raise OSError: if there is no cached body
+        """
+        shutil.copyfile(self._files(url)[1], destination)
+
+    def store(self, url: str, response: Response, path: Optional[str] = None) -> None:
+        """
+        Stores a response as pending if it has a validator.
+        :param url: the requested url including the query
+        :param response: a successful GET response
+        :param path: the file of the body of a streamed response, the body of the response is stored if not specified
+        :raise OSError:
+        """
+        meta = {'url': url, 'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified')}
+        if meta['etag'] is None and meta['last_modified'] is None:
+            return
+        os.makedirs(self._path, exist_ok=True)
+        meta_file, body_file = self._files(url)
+        if path is not None:
+            shutil.copyfile(path, body_file + HttpCache.__PENDING_SUFFIX)
+        else:
+            with open(body_file + HttpCache.__PENDING_SUFFIX, 'wb') as f:
+                f.write(response.content)
+        with open(meta_file + HttpCache.__PENDING_SUFFIX, 'w') as f:
+            json.dump(meta, f)
+        self._pending.append(url)
+
+    def commit(self) -> None:
+        """
+        Replaces the committed responses by the pending ones.
+        :raise OSError:
+        """
+        for url in self._pending:
+            for file in reversed(self._files(url)):  # the body first, the metadata refers to it
+                if os.path.exists(file + HttpCache.__PENDING_SUFFIX):
+                    os.replace(file + HttpCache.__PENDING_SUFFIX, file)
+        self._pending.clear()
+
+    def _files(self, url: str) -> tuple[str, str]:
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self._path, key + '.json'), os.path.join(self._path, key + '.body')
+
+    @staticmethod
+    def active() -> Optional["HttpCache"]:
+        return HttpCache.__ACTIVE.get()
+
+    @staticmethod
+    @contextlib.contextmanager
+    def activate(cache: Optional["HttpCache"]) -> Iterator[Optional["HttpCache"]]:
+        """
+        Makes a cache the active one within the context.
+        :param cache: a cache, None to disable caching
+        :return: the cache
+        """
+        token = HttpCache.__ACTIVE.set(cache)
+        try:
+            yield cache
+        finally:
+            HttpCache.__ACTIVE.reset(token)
@@ -1,43 +1,98 @@
 import enum
+import hashlib
 import json
+import os
+from http import HTTPStatus
 from json import JSONDecodeError
-from typing import Mapping
+from typing import Mapping, NamedTuple, Optional
 
 from requests import Session, Request, Response, RequestException, ReadTimeout
+from requests.adapters import HTTPAdapter
 
 from lib.ConsoleOutput import ConsoleOutput
+from lib.HttpCache import HttpCache
+from lib.RateLimiter import RateLimiter
 from lib.Retryer import Retryer
 
 
 class LoggableRequester:
     """
     A Simple Loggable Requester
+    The connections are kept alive in a pool of the requester session, which is created on the first request
+    and reused by the next ones and their retries, so close the requester (or use it as a context manager)
+    when it's not needed anymore.
+    The GET requests of static files may be revalidated with an HTTP cache (HttpCache.active() in the generators),
+    a 304 Not Modified response gets the cached body, so check its status code to skip the work on unchanged data.
     """
 
-    def __init__(self, logger: ConsoleOutput = None, retries = 3, timeout = 5, delay = 0):
+    def __init__(self, logger: ConsoleOutput = None, retries = 3, timeout = 5, delay = 0, pool_connections = 10, pool_maxsize = 10,
+                 rate_limiter: RateLimiter = None):
+        """
+        :param logger:
+        :param retries:
+        :param timeout:
+        :param delay:
+        :param pool_connections: the number of hosts to keep the connection pools for
+        :param pool_maxsize: the number of connections to keep alive per host, raise it for concurrent requests
+        :param rate_limiter: a limiter of the requests to a host, every attempt takes a token
+        """
         # protected non-static variables
         self._logger = ConsoleOutput(type(self).__name__) if logger is None else logger
         self._retries = retries
         self._timeout = timeout
         self._delay = delay
         self._msg = None
+        self._pool_connections = pool_connections
+        self._pool_maxsize = pool_maxsize
+        self._session: Session | None = None
+        self._rate_limiter = rate_limiter
+
+    def __enter__(self) -> "LoggableRequester":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Closes the pooled connections, the next request opens a new session.
+        """
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def _get_session(self) -> Session:
+        if self._session is None:
+            session = Session()
+            adapter = HTTPAdapter(pool_connections=self._pool_connections, pool_maxsize=self._pool_maxsize)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._session = session
+        return self._session
 
     class Methods(enum.StrEnum):
         GET = "GET"
         POST = "POST"
 
+    class Download(NamedTuple):
+        response: Response  # its body is consumed, 304 Not Modified if the cached file is still valid
+        digest: Optional[str]  # the hex digest of the file if a hash is requested
+
     def message(self, msg: str) -> "LoggableRequester":
         self._msg = msg
         return self
 
-    def request(self, method: Methods, url: str, headers: Mapping[str, str | bytes | None] = None, data: dict[str, str] = None) -> Response:
+    def request(self, method: Methods, url: str, headers: Mapping[str, str | bytes | None] = None, data: dict[str, str] = None, stream: bool = False,
+                cache: HttpCache = None) -> Response:
         """
 
         :param method:
         :param url:
         :param headers:
         :param data:
-        :return:
+        :param stream: don't read the body, it's read by the caller with Response.iter_content(), it's not cached
+        :param cache: an HTTP cache to revalidate a GET response with, only for static files, nothing is cached if None
+        :return: the response, 304 Not Modified with the cached body if the cached one is still valid
         :raise RequestException:
         """
         payload = {
@@ -46,10 +101,42 @@ class LoggableRequester:
         }
         self._logger.info(f"[{method.value}] Requesting to {url}... " if self._msg is None else self._msg, False)
         return (Retryer[Response](self._logger, self._retries, self._delay)
-                .apply(self.__request, method.value, url, self._timeout, headers, payload['data'], payload['params']))
+                .apply(self.__request, method.value, url, self._timeout, headers, payload['data'], payload['params'], stream,
+                       cache if method is LoggableRequester.Methods.GET and not stream else None))
 
+    def download(self, url: str, destination: str, headers: Mapping[str, str | bytes | None] = None, data: dict[str, str] = None,
+                 hash_name: str = None, chunk_size: int = 1 << 16, cache: HttpCache = None) -> Download:
+        """
+        Streams a GET response to a file without keeping the body in memory. The chunks are written to
+        <destination>.part, which replaces the destination once complete, so the destination is never partial.
+        A retry resumes the .part file by a Range request with If-Range of the validator of the first response,
+        so a changed file is downloaded anew instead of being continued by the new version.
+        :param url:
+        :param destination: a file path
+        :param headers:
+        :param data: the query parameters
+        :param hash_name: a hashlib algorithm name to compute the digest of the file while downloading
+        :param chunk_size:
+        :param cache: an HTTP cache to revalidate the response with as by request(), nothing is cached if None
+        :return: the response and the digest of the file
+        :raise RequestException:
+        :raise OSError:
+        """
+        part_file = destination + '.part'
+        open(part_file, 'wb').close()  # a .part file of another run may be of another version
+        validator = {}  # the If-Range value of the .part file, set by the response it's started with
+        self._logger.info(f"[GET] Downloading {url}... " if self._msg is None else self._msg, False)
+        try:
+            download = (Retryer[LoggableRequester.Download](self._logger, self._retries, self._delay)
+                        .apply(self.__download, url, self._timeout, headers, data, part_file, hash_name, chunk_size, cache, validator))
+            os.replace(part_file, destination)
+            return download
+        except Exception as e:
+            if os.path.exists(part_file):
+                os.remove(part_file)
+            raise e
 
-    def __request(self, method: Methods, url, timeout, headers, data, params) -> Response:
+    def __request(self, method: Methods, url, timeout, headers, data, params, stream=False, cache: HttpCache = None) -> Response:
         """
 
         :param method:
@@ -61,11 +148,20 @@ class LoggableRequester:
         """
         request = Request(method, url, headers=headers, data=data, params=params)
         prepared_request = request.prepare()
+        conditional_headers = cache.headers(prepared_request.url) if cache is not None else {}
+        prepared_request.headers.update(conditional_headers)
         try:
-            with Session() as session:
-                response = session.send(prepared_request, timeout=timeout)
+            if self._rate_limiter is not None:
+                self._rate_limiter.acquire(prepared_request.url)
+            response = self._get_session().send(prepared_request, timeout=timeout, stream=stream)
             if not response: # checks the response status code and raises an exception for HTTP errors (4xx or 5xx)
                 raise RequestException(request=request, response=response)
+            if response.status_code == HTTPStatus.NOT_MODIFIED and conditional_headers:
+                response._content = cache.load(prepared_request.url)
+                self._logger.info("NOT MODIFIED", True, ConsoleOutput.Foreground.REGULAR_GREEN)
+                return response
+            if cache is not None:
+                cache.store(prepared_request.url, response)
             self._logger.info("OK", True, ConsoleOutput.Foreground.REGULAR_GREEN)
             return response
         except ReadTimeout as e:
@@ -80,3 +176,81 @@ class LoggableRequester:
             except (JSONDecodeError, KeyError, TypeError):
                 self._logger.error(msg)
             raise e
+
+    def __download(self, url, timeout, headers, params, part_file, hash_name, chunk_size, cache, validator) -> Download:
+        """
+
+        :param url:
+        :param timeout:
+        :param headers:
+        :param params:
+        :param part_file: the file of the downloaded part, it's continued if the server supports ranges
+        :param hash_name:
+        :param chunk_size:
+        :param cache:
+        :param validator: the 'If-Range' value of the .part file, it's set when a new .part file is started
+        :return:
+        :raise RequestException:
+        :raise OSError:
+        """
+        offset = os.path.getsize(part_file) if validator.get('If-Range') else 0  # no safe resume without a validator
+        range_headers = {'Range': f"bytes={offset}-", 'If-Range': validator['If-Range']} if offset else {}
+        request = Request("GET", url, headers={**(headers or {}), **range_headers}, params=params)
+        prepared_request = request.prepare()
+        conditional_headers = cache.headers(prepared_request.url) if cache is not None and not offset else {}
+        prepared_request.headers.update(conditional_headers)
+        digest = hashlib.new(hash_name) if hash_name else None
+        try:
+            if self._rate_limiter is not None:
+                self._rate_limiter.acquire(prepared_request.url)
+            with self._get_session().send(prepared_request, timeout=timeout, stream=True) as response:
+                if offset and response.status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE:
+                    open(part_file, 'wb').close()  # the part is not of the current version, the next attempt restarts
+                if not response:
+                    raise RequestException(request=request, response=response)
+                if response.status_code == HTTPStatus.NOT_MODIFIED and conditional_headers:
+                    cache.copy(prepared_request.url, part_file)
+                    if digest is not None:
+                        self.__hash_file(part_file, digest)
+                else:
+                    # a 200 reply to a range request is the whole (possibly changed) file, it's written anew
+                    resumed = (offset and response.status_code == HTTPStatus.PARTIAL_CONTENT and
+                               response.headers.get('Content-Range', '').startswith(f"bytes {offset}-"))
+                    if offset and not resumed and response.status_code == HTTPStatus.PARTIAL_CONTENT:
+                        open(part_file, 'wb').close()
+                        raise RequestException(f"Unexpected range {response.headers.get('Content-Range')}",
+                                               request=request, response=response)
+                    if not resumed:
+                        validator.clear()
+                        etag = response.headers.get('ETag', '')
+                        # a weak ETag can't be used by If-Range
+                        if_range = etag if etag and not etag.startswith('W/') else response.headers.get('Last-Modified')
+                        if if_range:
+                            validator['If-Range'] = if_range
+                    if resumed and digest is not None:
+                        self.__hash_file(part_file, digest)
+                    try:
+                        with open(part_file, 'ab' if resumed else 'wb') as f:
+                            for chunk in response.iter_content(chunk_size):
+                                if digest is not None:
+                                    digest.update(chunk)
+                                f.write(chunk)
+                    except RequestException as e:
+                        if response.headers.get('Content-Encoding', 'identity') != 'identity':
+                            open(part_file, 'wb').close()  # the decoded part is not a range of the encoded body
+                        raise e
+                    if cache is not None:
+                        cache.store(prepared_request.url, response, part_file)
+            self._logger.info("NOT MODIFIED" if response.status_code == HTTPStatus.NOT_MODIFIED else "OK", True,
+                              ConsoleOutput.Foreground.REGULAR_GREEN)
+            return LoggableRequester.Download(response, digest.hexdigest() if digest is not None else None)
+        except RequestException as e:
+            self._logger.info("FAIL", True, ConsoleOutput.Foreground.REGULAR_RED)
+            self._logger.error(f"{e.response.status_code} - {e.response.reason}" if e.response is not None else e)
+            raise e
+
+    @staticmethod
+    def __hash_file(path: str, digest) -> None:
+        with open(path, 'rb') as f:
+            while chunk := f.read(1 << 16):
+                digest.update(chunk)
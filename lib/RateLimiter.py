@@ -0,0 +1,64 @@
+import asyncio
+import threading
+import time
+from typing import Mapping, Optional
+from urllib.parse import urlsplit
+
+
+class RateLimiter:
+    """
+    A token bucket per host: a host gets up to burst requests at once and rate requests per second after that.
+    A request reserves a token and waits until the token is refilled, so the waiting requests are spread evenly.
+    Thread-safe, one limiter may be shared by LoggableRequester and AsyncLoggableRequester instances
+    to limit all their requests to a host together.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, hosts: Optional[Mapping[str, tuple[float, int]]] = None):
+        """
+        :param rate: the number of requests per second to a host
+        :param burst: the number of requests to a host without waiting
+        :param hosts: (rate, burst) of the hosts which have other limits, the hosts are host[:port] as in the urls
+        :raise ValueError: if a rate is not positive or a burst is less than 1
+        """
+        super().__init__()
+        for host_rate, host_burst in [(rate, burst), *(hosts or {}).values()]:
+            if host_rate <= 0 or host_burst < 1:
+                raise ValueError(f"{type(self).__name__}: invalid rate {host_rate} or burst {host_burst}")
+        # protected non-static variables
+        self._limits = dict(hosts or {})
+        self._default = (rate, burst)
+        self._buckets: dict[str, tuple[float, float]] = {}  # host -> (tokens, the time of tokens)
+        self._lock = threading.Lock()
+
+    def reserve(self, url: str) -> float:
+        """
+        Takes a token of the host of a url.
+        :param url: a request url
+        :return: the number of seconds to wait before the request
+        """
+        host = urlsplit(url).netloc
+        rate, burst = self._limits.get(host, self._default)
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated = self._buckets.get(host, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate) - 1
+            self._buckets[host] = (tokens, now)
+        return -tokens / rate if tokens < 0 else 0.0
+
+    def acquire(self, url: str) -> None:
+        """
+        Waits for a token of the host of a url.
+        :param url: a request url
+        """
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, url: str) -> None:
+        """
+        The same as acquire for coroutines.
+        :param url: a request url
+        """
+        delay = self.reserve(url)
+        if delay > 0:
+            await asyncio.sleep(delay)
@@ -1,3 +1,4 @@
+import asyncio
 import time
 from typing import Callable, Generic, TypeVar
 
@@ -26,3 +27,23 @@ class Retryer(Generic[T]):
                         time.sleep(self._delay)
                     self._logger.info("... ", False)
         raise RequestException("Attempts are left")
+
+    async def apply_async(self, func: Callable, *args) -> T:
+        """
+        The same as apply for a coroutine function, the attempts are logged by whole lines
+        as the other coroutines may log in between.
+        :param func: a coroutine function
+        :param args: its arguments
+        :return: the result of the first successful attempt
+        :raise RequestException: if all attempts have failed
+        """
+        for i in range(self._retries + 1):
+            try:
+                return await func(*args)
+            except Exception:
+                if i < self._retries:
+                    delay = f" (delay {self._delay} sec)" if self._delay > 0 else ""
+                    self._logger.info(f"Applying {i+1}/{self._retries} attempt{delay}... ")
+                    if self._delay > 0:
+                        await asyncio.sleep(self._delay)
+        raise RequestException("Attempts are left")
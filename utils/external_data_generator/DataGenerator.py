@@ -1,10 +1,21 @@
+import os
 from abc import ABC, abstractmethod
+from http import HTTPStatus
+from typing import Iterable
+
+from requests import Response
 
 from lib.ConsoleOutput import ConsoleOutput
 
 
 class DataGenerator(ABC):
 
+    class NotModified(Exception):
+        """
+        Raised by generate() when its sources haven't changed since the stored state was generated
+        """
+        pass
+
     def __init__(self):
         super().__init__()
         self._logger = ConsoleOutput(type(self).__name__)
@@ -13,5 +24,19 @@ class DataGenerator(ABC):
     def generate(self) -> list[str]:
         """
         Handler interface for data cluster
+        :raise DataGenerator.NotModified: if there is nothing to store
         """
         pass
+
+    @staticmethod
+    def _check_modified(*responses: Response, downloaded: Iterable[str] = ()) -> None:
+        """
+        :param responses: the responses of all sources of the generated files
+        :param downloaded: the files of the responses, they are removed if not modified
+        :raise DataGenerator.NotModified: if all responses are 304 Not Modified (see HttpCache)
+        """
+        if responses and all(response.status_code == HTTPStatus.NOT_MODIFIED for response in responses):
+            for path in downloaded:
+                if os.path.exists(path):
+                    os.remove(path)
+            raise DataGenerator.NotModified(f"{', '.join(response.url for response in responses)} not modified")
@@ -1,11 +1,11 @@
 import asyncio
 import json
 
-import aiohttp
-
 from DataGenerator import DataGenerator
+from lib.AsyncLoggableRequester import AsyncLoggableRequester
 from lib.ConsoleOutput import ConsoleOutput
 from lib.LoggableRequester import LoggableRequester
+from lib.RateLimiter import RateLimiter
 from utils import get_headers
 
 
@@ -17,32 +17,32 @@ class BivaDataGenerator(DataGenerator):
 
     __BLACK_LIST = ["CKDs", "SIC Deuda", "Warrants", "CERPIs"]
 
-    async def __fetch_isin(self, session, url, isin_queue) -> None:
+    async def __fetch_isin(self, requester, url, isin_queue) -> None:
         """
-        :param session: aiohttp.ClientSession()
+        :param requester: AsyncLoggableRequester
         :param url: symbol's url
         :param isin_queue: queue for saving the results of async parsing
         """
-        async with session.get(url, headers=get_headers()) as response:
-            try:
-                data = await response.json()
-            except json.JSONDecodeError as e:
-                self._logger.error(f"Error decoding JSON for {url}: {e}")
-                return
+        response = await requester.request(AsyncLoggableRequester.Methods.GET, url, headers=get_headers())
+        try:
+            data = await response.json()
+        except json.JSONDecodeError as e:
+            self._logger.error(f"Error decoding JSON for {url}: {e}")
+            return
 
-            isin_id = int(url.split("/")[5])
-            try:
-                for symbol in range(len(data["content"])):
-                    if data["content"][symbol]["tipoInstrumento"] in self.__BLACK_LIST:
-                        continue
-                    serie = data["content"][symbol]["serie"]
-                    isin = data["content"][symbol]["isin"]
-
-                    if isin_id is not None and isin is not None:
-                        isin_queue.put_nowait((isin_id, serie, isin))
-            except KeyError:
-                self._logger.info(f"No data {url}")
-                return
+        isin_id = int(url.split("/")[5])
+        try:
+            for symbol in range(len(data["content"])):
+                if data["content"][symbol]["tipoInstrumento"] in self.__BLACK_LIST:
+                    continue
+                serie = data["content"][symbol]["serie"]
+                isin = data["content"][symbol]["isin"]
+
+                if isin_id is not None and isin is not None:
+                    isin_queue.put_nowait((isin_id, serie, isin))
+        except KeyError:
+            self._logger.info(f"No data {url}")
+            return
 
     async def __get_isins(self, urls: list) -> list:
         """
@@ -53,18 +53,14 @@ class BivaDataGenerator(DataGenerator):
 
         isin_queue = asyncio.Queue()
 
-        iterations_amount = 10
-        tasks_amount = int(len(urls) / iterations_amount)
-        for iteration in range(iterations_amount):
-            start = iteration * tasks_amount
-            finish = start + tasks_amount
-            if iteration == iterations_amount - 1:
-                finish = len(urls)
-            self._logger.info(f"Requesting ISIN data [{start}..{finish})(from total {len(urls)})... ")
-            async with aiohttp.ClientSession() as session:
-                tasks = [self.__fetch_isin(session, url, isin_queue) for url in urls[start:finish]]
-                await asyncio.gather(*tasks)
-            self._logger.info("DONE", color=ConsoleOutput.Foreground.REGULAR_GREEN)
+        self._logger.info(f"Requesting ISIN data (total {len(urls)})... ")
+        # 20 connections with ~1 sec responses make ~20 requests per second, the rate caps the faster responses;
+        # a token is taken once a connection slot is held, so the waiting requests don't pile up behind the rate
+        async with AsyncLoggableRequester(self._logger, timeout=15, delay=5, limit_per_host=20,
+                                          rate_limiter=RateLimiter(rate=20, burst=20)) as requester:
+            tasks = [self.__fetch_isin(requester, url, isin_queue) for url in urls]
+            await asyncio.gather(*tasks)
+        self._logger.info("DONE", color=ConsoleOutput.Foreground.REGULAR_GREEN)
 
         while not isin_queue.empty():
             isin_id, serie, isin = isin_queue.get_nowait()
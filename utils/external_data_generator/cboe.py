@@ -1,4 +1,5 @@
 from DataGenerator import DataGenerator
+from lib.HttpCache import HttpCache
 from lib.LoggableRequester import LoggableRequester
 
 
@@ -7,10 +8,12 @@ class CBOEDataGenerator(DataGenerator):
     def generate(self) -> list[str]:
         url = "https://www.cboe.com/us/equities/market_statistics/listed_symbols/csv/"
         try:
-            csv = LoggableRequester(self._logger).request(LoggableRequester.Methods.GET, url).text
+            response = LoggableRequester(self._logger).request(LoggableRequester.Methods.GET, url, cache=HttpCache.active())
         except OSError as e:
             self._logger.error(e)
             raise e
+        self._check_modified(response)
+        csv = response.text
 
         out_file = "cboe.csv"
         try:
@@ -42,15 +42,16 @@ class CFIUploader(DataGenerator):
     def get_cfi(self) -> dict[str, str]:
         res = {}
         host = self.get_env()
-        for code in self.get_bourse_codes():
-            data = LoggableRequester(self._logger, timeout=30).request(LoggableRequester.Methods.GET, f"http://{host}/tvf/upstream/sixmdfstream/streaming/symbols?source={code}&additionalFields=TDF_ISIN,TDF_CFI").text
-            for s in data.split("\n"):
-                symbol = s.split(",")
-                if len(symbol) < 3:
-                    continue
-                val, isin, cfi = symbol
-                if cfi != "":
-                    res[isin] = cfi
+        with LoggableRequester(self._logger, timeout=30) as requester:
+            for code in self.get_bourse_codes():
+                data = requester.request(LoggableRequester.Methods.GET, f"http://{host}/tvf/upstream/sixmdfstream/streaming/symbols?source={code}&additionalFields=TDF_ISIN,TDF_CFI").text
+                for s in data.split("\n"):
+                    symbol = s.split(",")
+                    if len(symbol) < 3:
+                        continue
+                    val, isin, cfi = symbol
+                    if cfi != "":
+                        res[isin] = cfi
         return res
 
 
@@ -3,6 +3,7 @@ import os
 import pandas as pd
 
 from DataGenerator import DataGenerator
+from lib.HttpCache import HttpCache
 from lib.LoggableRequester import LoggableRequester
 
 
@@ -10,9 +11,8 @@ class CFTCDataGenerator(DataGenerator):
 
     def _request_file(self, dst: str):
         url = "https://www.cftc.gov/strike-price-xls?col=ExchId%2CContractName&dir=ASC%2CASC"
-        response = LoggableRequester(self._logger).request(LoggableRequester.Methods.GET, url)
-        with open(dst, "wb") as file:
-            file.write(response.content)
+        with LoggableRequester(self._logger) as requester:
+            self._check_modified(requester.download(url, dst, cache=HttpCache.active()).response, downloaded=[dst])
 
     def generate(self) -> list[str]:
         xlsx_filename = "strike-price-report.xlsx"
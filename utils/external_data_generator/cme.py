@@ -44,9 +44,10 @@ class CmeProductsParser(ABC):
     def parse_symbols(self):
         pass
 
-    def get_total_pages(self):
+    def get_total_pages(self, requester: LoggableRequester):
         """
 
+        :param requester: the requester of the pages
         :return:
         :raise RequestException:
         :raise KeyError:
@@ -63,7 +64,7 @@ class CmeProductsParser(ABC):
             f"cleared={self._get_product}",
             f"isProtected"
         ]
-        resp = LoggableRequester(self._logger, timeout=10).request(LoggableRequester.Methods.GET, f"{self._BASE_URL}?{'&'.join(req_params)}", headers=self._HEADERS)
+        resp = requester.request(LoggableRequester.Methods.GET, f"{self._BASE_URL}?{'&'.join(req_params)}", headers=self._HEADERS)
         first_page = resp.json()
         return first_page['props']['pageTotal']
 
@@ -81,43 +82,41 @@ class CmeOptionsParser(CmeProductsParser):
     def parse_symbols(self) -> None:
         with open(self.get_filename, "w", encoding="utf-8") as file:
             file.write("prodCode;name\n")
-            total_pages = self.get_total_pages()
-            requester = LoggableRequester(self._logger, timeout=10)
-            for i in range(1, total_pages + 1):
-                req_params = [
-                    f"sortAsc=false",
-                    f"sortField=oi",
-                    f"pageNumber={i}",
-                    f"pageSize=500",
-                    f"group=",
-                    f"subGroup=",
-                    f"venues=",
-                    f"exch=",
-                    f"cleared={self._get_product}",
-                    f"isProtected"
-                ]
-                page = requester.request(LoggableRequester.Methods.GET, f"{self._BASE_URL}?{'&'.join(req_params)}", headers=self._HEADERS).json()
-
-                products = page['products']
-                for product in products:
-                    root = product['prodCode']
-                    description = product['name']
-
-                    file.write(f"{root};{description}\n")
-
-            response = requester.request(LoggableRequester.Methods.GET, "https://www.cftc.gov/strike-price-xls?col=ExchId%2CContractName&dir=ASC%2CASC")
-            xlsx_filename = "strike-price-report.xlsx"
-            with open(xlsx_filename, "wb") as xls:
-                xls.write(response.content)
-
-            excel_data = pd.read_excel(xlsx_filename)
-            roots = excel_data.groupby('Comm. Code')
-
-            for root_id, root in roots:
-                if root['OptionClass'].unique()[0] == "ONE DAY":
-                    file.write(f"{root_id};{root['ContractName'].unique()[0]}\n")
-
-            os.remove(xlsx_filename)
+            with LoggableRequester(self._logger, timeout=10) as requester:
+                total_pages = self.get_total_pages(requester)
+                for i in range(1, total_pages + 1):
+                    req_params = [
+                        f"sortAsc=false",
+                        f"sortField=oi",
+                        f"pageNumber={i}",
+                        f"pageSize=500",
+                        f"group=",
+                        f"subGroup=",
+                        f"venues=",
+                        f"exch=",
+                        f"cleared={self._get_product}",
+                        f"isProtected"
+                    ]
+                    page = requester.request(LoggableRequester.Methods.GET, f"{self._BASE_URL}?{'&'.join(req_params)}", headers=self._HEADERS).json()
+
+                    products = page['products']
+                    for product in products:
+                        root = product['prodCode']
+                        description = product['name']
+
+                        file.write(f"{root};{description}\n")
+
+                xlsx_filename = "strike-price-report.xlsx"
+                requester.download("https://www.cftc.gov/strike-price-xls?col=ExchId%2CContractName&dir=ASC%2CASC", xlsx_filename)
+
+                excel_data = pd.read_excel(xlsx_filename)
+                roots = excel_data.groupby('Comm. Code')
+
+                for root_id, root in roots:
+                    if root['OptionClass'].unique()[0] == "ONE DAY":
+                        file.write(f"{root_id};{root['ContractName'].unique()[0]}\n")
+
+                os.remove(xlsx_filename)
 
 
 class CmeFuturesParser(CmeProductsParser):
@@ -133,32 +132,32 @@ class CmeFuturesParser(CmeProductsParser):
     def parse_symbols(self) -> None:
         with open(self.get_filename, "w", encoding="utf-8") as file:
             file.write("Clearing;prodCode;name;Group;Sub Group\n")
-            total_pages = self.get_total_pages()
-            requester = LoggableRequester(self._logger, timeout=10)
-            for i in range(1, total_pages + 1):
-                req_params = [
-                    f"sortAsc=false",
-                    f"sortField=oi",
-                    f"pageNumber={i}",
-                    f"pageSize=500",
-                    f"group=",
-                    f"subGroup=",
-                    f"venues=",
-                    f"exch=",
-                    f"cleared={self._get_product}",
-                    f"isProtected"
-                ]
-                page = requester.request(LoggableRequester.Methods.GET, f"{self._BASE_URL}?{'&'.join(req_params)}", headers=self._HEADERS).json()
-
-                products = page['products']
-                for product in products:
-                    root = product['prodCode']
-                    description = product['name']
-                    group = product['group']
-                    subGroup = product['subGroup']
-                    Clearing = product['clearing']
-
-                    file.write(f"{Clearing};{root};{description};{group};{subGroup}\n")
+            with LoggableRequester(self._logger, timeout=10) as requester:
+                total_pages = self.get_total_pages(requester)
+                for i in range(1, total_pages + 1):
+                    req_params = [
+                        f"sortAsc=false",
+                        f"sortField=oi",
+                        f"pageNumber={i}",
+                        f"pageSize=500",
+                        f"group=",
+                        f"subGroup=",
+                        f"venues=",
+                        f"exch=",
+                        f"cleared={self._get_product}",
+                        f"isProtected"
+                    ]
+                    page = requester.request(LoggableRequester.Methods.GET, f"{self._BASE_URL}?{'&'.join(req_params)}", headers=self._HEADERS).json()
+
+                    products = page['products']
+                    for product in products:
+                        root = product['prodCode']
+                        description = product['name']
+                        group = product['group']
+                        subGroup = product['subGroup']
+                        Clearing = product['clearing']
+
+                        file.write(f"{Clearing};{root};{description};{group};{subGroup}\n")
 
 
 class CmeRootsGenerator(CmeProductsParser):
@@ -180,10 +179,10 @@ class CmeRootsGenerator(CmeProductsParser):
         else:
             return ("0", "2")
 
-    def get_si(self, group: str):
+    def get_si(self, requester: LoggableRequester, group: str):
         res = {}
         hub, port = self.get_env()
-        si = LoggableRequester(self._logger, timeout=30).request(LoggableRequester.Methods.GET, f"http://hub{hub}.xtools.tv:809{port}/symbol_info?group={group}").json()
+        si = requester.request(LoggableRequester.Methods.GET, f"http://hub{hub}.xtools.tv:809{port}/symbol_info?group={group}").json()
         roots = si.get("root")
         if roots is not None:
             if isinstance(roots, list):
@@ -209,10 +208,11 @@ class CmeRootsGenerator(CmeProductsParser):
           "cme_2_globex_continuous"]
         with open(self.get_filename, "w") as file:
             file.write("root;pointvalue;underlying-prefix\n")
-            for group in groups:
-                res = self.get_si(group)
-                for k, v in res.items():
-                    file.write(f"{k};{v}\n")
+            with LoggableRequester(self._logger, timeout=30) as requester:
+                for group in groups:
+                    res = self.get_si(requester, group)
+                    for k, v in res.items():
+                        file.write(f"{k};{v}\n")
 
 
 class CMEDataGenerator(DataGenerator):
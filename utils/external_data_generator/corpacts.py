@@ -1,8 +1,10 @@
+import os
 import re
+from typing import Iterable, Iterator, TextIO
 
 from DataGenerator import DataGenerator
+from lib.HttpCache import HttpCache
 from lib.LoggableRequester import LoggableRequester
-from utils import file_writer
 
 class CorpactsDataGenerator(DataGenerator):
 
@@ -11,30 +13,36 @@ class CorpactsDataGenerator(DataGenerator):
         "http://fs2.esignal.com/CorpActs.tab"
     ]
 
-    def _request_data(self, url: str) -> str:
-        requester = LoggableRequester(self._logger, retries=5, delay=5)
-        try:
-            resp = requester.request(LoggableRequester.Methods.GET, url, {})
-            return resp.text
-        except IOError as e:
-            self._logger.error(e)
-            raise e
+    def _request_data(self, url: str, dst: str) -> str:
+        """
+        :return: the encoding of the downloaded file
+        """
+        with LoggableRequester(self._logger, retries=5, delay=5) as requester:
+            try:
+                resp = requester.download(url, dst, cache=HttpCache.active()).response
+                self._check_modified(resp, downloaded=[dst])
+                return resp.encoding or "utf-8"  # the charset of the Content-Type
+            except IOError as e:
+                self._logger.error(e)
+                raise e
 
-    def _get_data(self) -> str:
+    def _get_data(self, dst: str) -> str:
+        """
+        :return: the encoding of the downloaded file
+        """
         for url in self.URLS:
             try:
-                data = self._request_data(url)
-                return data
+                return self._request_data(url, dst)
             except IOError as e:
                 pass
         raise Exception("Can't get data from source")
 
-    def _calc_last_corpact(self, corpacts_data: str) -> dict[str, tuple[str, str]]:
+    def _calc_last_corpact(self, corpacts_lines: Iterable[str]) -> dict[str, tuple[str, str]]:
         last_date = "19000101"
         skipping = False
         last_corpacts = dict()
         line_num = 0
-        for line in corpacts_data.splitlines():
+        for line in corpacts_lines:
             line_num += 1
             line = line.strip()
             if re.match("^[12][0-9]{3}(0[1-9]|1[0-2])(0[1-9]|[1-2][0-9]|3[01])$", line):
@@ -63,6 +71,25 @@ class CorpactsDataGenerator(DataGenerator):
             last_corpacts[symbol] = (last_date, factor)
         return last_corpacts
 
+    def _read_corpacts(self, src_path: str, encoding: str, dst_path: str) -> dict[str, tuple[str, str]]:
+        """
+        Transcodes the downloaded CorpActs.tab to UTF-8 and calculates the last corpacts in one pass,
+        the line endings are kept as is.
+        :raise UnicodeDecodeError: if the file is not in the encoding
+        """
+        with open(src_path, "r", encoding=encoding, newline="") as src, \
+                open(dst_path, "w", encoding="utf-8", newline="") as dst:
+            return self._calc_last_corpact(self._transcode(src, dst))
+
+    @staticmethod
+    def _transcode(src: TextIO, dst: TextIO) -> Iterator[str]:
+        """
+        Copies the lines of a file to another one (UTF-8, as CorpActs.tab is published) while they are iterated.
+        """
+        for line in src:
+            dst.write(line)
+            yield line
+
     @staticmethod
     def _write_last_corpacts(last_corpacts: dict[str, tuple[str, str]], path: str) -> None:
         with open(path, "w") as f:
@@ -73,15 +100,20 @@ class CorpactsDataGenerator(DataGenerator):
     def generate(self) -> list[str]:
 
         corpacts_name = "CorpActs.tab"
-        corpacts_data = self._get_data()
+        downloaded_name = corpacts_name + ".download"
+        encoding = self._get_data(downloaded_name)
+
+        last_corpacts_name = "LastCorpActs.tab"
         try:
-            file_writer(corpacts_data, corpacts_name)
+            try:
+                last_corpacts = self._read_corpacts(downloaded_name, encoding, corpacts_name)
+            except UnicodeDecodeError as e:
+                self._logger.warn(f"{downloaded_name} is not in {encoding} ({e}), reading it as ISO-8859-1")
+                last_corpacts = self._read_corpacts(downloaded_name, "ISO-8859-1", corpacts_name)
+            os.remove(downloaded_name)
         except IOError as e:
             self._logger.error(e)
             raise e
-
-        last_corpacts_name = "LastCorpActs.tab"
-        last_corpacts = self._calc_last_corpact(corpacts_data)
         if len(last_corpacts) < 100_000:
             e = Exception(f"Too small resulting {last_corpacts_name}")
             self._logger.error(e)
@@ -15,8 +15,10 @@ from cftc_code import CFTCDataGenerator
 from cmc_defi import CMCDataGenerator
 from cme import CMEDataGenerator
 from corpacts import CorpactsDataGenerator
+from DataGenerator import DataGenerator
 from euronextmilan import EURONEXTUnderlyingGenerator
 from lib.ConsoleOutput import ConsoleOutput
+from lib.HttpCache import HttpCache
 from moex import MOEXDataGenerator
 from mstar import MstarDataGenerator
 from nasdaq_gids import NASDAQGIDSDataGenerator
@@ -59,11 +61,18 @@ def main(args, logger):
             shutil.rmtree(remote_state_archive, ignore_errors=True)
             continue
 
+        # the cache of every state of every bucket is separate, a source may be not modified for one state
+        # and modified for another (e.g. after a failed upload of another environment)
+        cache = HttpCache(os.path.join(args.http_cache, bucket_name, state_dir, state_name)) if args.http_cache else None
         try:
-            files = handler['generator']()
+            with HttpCache.activate(cache):
+                files = handler['generator']()
             if len(files) == 0:
                 logger.error(f"No file in generator result for '{cluster_name}'")
                 return Codes.OK
+        except DataGenerator.NotModified as e:
+            logger.info(f"Skipping {state_dir}/{state_name}: {e}")
+            continue
         except Exception as e:
             logger.error(f"Failed to generate files for '{cluster_name}' data cluster CAUSED BY: {e}")
             return Codes.ERROR
@@ -79,6 +88,8 @@ def main(args, logger):
             archive_name = logger.log("Archiving new files... ", archive_files, files, state_name)
             logger.log(f"Uploading state {state_dir}/{state_name}... ", upload_state, archive_name, bucket_name, f"{state_dir}/{state_name}")
             logger.info(f"Successfully uploaded {state_name} to s3://{bucket_name}/{state_dir}/{state_name}.")
+            if cache is not None:
+                cache.commit()
         except Exception as e:
             logger.error(f"Failed to update {','.join(files)} files into '{state_dir}/{state_name}' state for '{cluster_name}' data cluster CAUSED BY:")
             logger.error(e)
@@ -148,6 +159,9 @@ if __name__ == "__main__":
                         help="Branch for delivery changed files (if empty then changed files will not delivers)")
     parser.add_argument("--copy", action=argparse.BooleanOptionalAction, help="Download from prod and upload")
     parser.add_argument("--compare", action=argparse.BooleanOptionalAction, help="Compare with remote")
+    parser.add_argument("--http_cache", type=str, default=None, required=False,
+                        help="Directory of the HTTP cache of the sources (if empty then the sources are always downloaded), "
+                             "the states of not modified sources are not generated")
 
     try:
         exit(main(parser.parse_args(), logger))
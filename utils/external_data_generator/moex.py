@@ -6,7 +6,6 @@ import math
 import os
 from collections import deque
 
-from lib.ConsoleOutput import ConsoleOutput
 from lib.LoggableRequester import LoggableRequester
 from DataGenerator import DataGenerator
 
@@ -16,7 +15,7 @@ def write_to_file(filename, content):
         json.dump(content, file, ensure_ascii=False)
 
 
-def request_boards_securities(logger: ConsoleOutput, headers: dict[str, str]):
+def request_boards_securities(requester: LoggableRequester, headers: dict[str, str]):
 
     def count_names(data: dict):
         queue = deque([data])
@@ -66,7 +65,6 @@ def request_boards_securities(logger: ConsoleOutput, headers: dict[str, str]):
     boards_securities = {}
     num_of_names = count_names(boards)
     curr_req_num = 1
-    requester = LoggableRequester(logger)
     for instr_t, instr_subtypes in boards.items():
         for instr_subtype, boards in instr_subtypes.items():
             for board in boards["names"]:
@@ -89,13 +87,12 @@ def request_boards_securities(logger: ConsoleOutput, headers: dict[str, str]):
     return boards_securities
 
 
-def paginated_request(logger: ConsoleOutput, base_url, headers: dict[str, str], params: dict, start: int, page_size: int):
+def paginated_request(requester: LoggableRequester, base_url, headers: dict[str, str], params: dict, start: int, page_size: int):
     resp = {
         "rates": {
             "data": []
         }
     }
-    requester = LoggableRequester(logger)
     processed, total, counter = start, start, 1
     while processed <= total:
         requester.message(f"Requesting page {counter}/{'undefined' if start == total else math.ceil(total/page_size)}... ")
@@ -136,41 +133,43 @@ class MOEXDataGenerator(DataGenerator):
             "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8"
         }
 
-        boards_securities = request_boards_securities(self._logger, headers)
-        self._logger.log("Writing to file... ", write_to_file, dictionaries_paths["boards_securities"], boards_securities)
-        if not os.path.getsize(dictionaries_paths["boards_securities"]):
-            e = OSError("Requested data are empty")
-            self._logger.error(e)
-            raise e
-
-        index_boards_securities_url = "https://iss.moex.com/iss/engines/stock/markets/index/securities.json"
-        index_boards_securities = (LoggableRequester(self._logger).message("Requesting index boards securities... ")
-                                   .request(LoggableRequester.Methods.GET, index_boards_securities_url, headers, {"lang": "ru"}).json())
-
-        self._logger.log("Writing to file... ", write_to_file, dictionaries_paths["index_boards_securities"], index_boards_securities)
-        if not os.path.getsize(dictionaries_paths["index_boards_securities"]):
-            e = OSError("Requested data are empty")
-            self._logger.error(e)
-            raise e
-
-        rates_base_url = "https://iss.moex.com/iss/apps/infogrid/stock/rates.json"
-        rates_base_url_params = {"_": 1607005374424, "lang": "ru", "iss.meta": "off", "sort_order": "asc", "sort_column": "SECID"}
-        morning_rates_url_params = rates_base_url_params | {"morning": 1}
-        morning_moex_stock_rates = paginated_request(self._logger, rates_base_url, headers, morning_rates_url_params, 0, 100)
-        evening_rates_url_params = rates_base_url_params | {"evening": 1}
-        evening_moex_stock_rates = paginated_request(self._logger, rates_base_url, headers, evening_rates_url_params, 0, 100)
-        weekend_rates_url_params = rates_base_url_params | {"weekend": 1}
-        weekend_moex_stock_rates = paginated_request(self._logger, rates_base_url, headers, weekend_rates_url_params, 0, 100)
-        moex_stock_rates = {
-            "morning": morning_moex_stock_rates['rates'],
-            "evening": evening_moex_stock_rates['rates'],
-            "weekend": weekend_moex_stock_rates['rates'],
-        }
-        self._logger.log("Writing to file... ", write_to_file, dictionaries_paths["stock_rates"], moex_stock_rates)
-        if not os.path.getsize(dictionaries_paths["stock_rates"]):
-            e = OSError("Requested data are empty")
-            self._logger.error(e)
-            raise e
+        # a pooled session shared by all requests, so the cookies and keep-alive connections are reused
+        with LoggableRequester(self._logger) as requester:
+            boards_securities = request_boards_securities(requester, headers)
+            self._logger.log("Writing to file... ", write_to_file, dictionaries_paths["boards_securities"], boards_securities)
+            if not os.path.getsize(dictionaries_paths["boards_securities"]):
+                e = OSError("Requested data are empty")
+                self._logger.error(e)
+                raise e
+
+            index_boards_securities_url = "https://iss.moex.com/iss/engines/stock/markets/index/securities.json"
+            index_boards_securities = (requester.message("Requesting index boards securities... ")
+                                       .request(LoggableRequester.Methods.GET, index_boards_securities_url, headers, {"lang": "ru"}).json())
+
+            self._logger.log("Writing to file... ", write_to_file, dictionaries_paths["index_boards_securities"], index_boards_securities)
+            if not os.path.getsize(dictionaries_paths["index_boards_securities"]):
+                e = OSError("Requested data are empty")
+                self._logger.error(e)
+                raise e
+
+            rates_base_url = "https://iss.moex.com/iss/apps/infogrid/stock/rates.json"
+            rates_base_url_params = {"_": 1607005374424, "lang": "ru", "iss.meta": "off", "sort_order": "asc", "sort_column": "SECID"}
+            morning_rates_url_params = rates_base_url_params | {"morning": 1}
+            morning_moex_stock_rates = paginated_request(requester, rates_base_url, headers, morning_rates_url_params, 0, 100)
+            evening_rates_url_params = rates_base_url_params | {"evening": 1}
+            evening_moex_stock_rates = paginated_request(requester, rates_base_url, headers, evening_rates_url_params, 0, 100)
+            weekend_rates_url_params = rates_base_url_params | {"weekend": 1}
+            weekend_moex_stock_rates = paginated_request(requester, rates_base_url, headers, weekend_rates_url_params, 0, 100)
+            moex_stock_rates = {
+                "morning": morning_moex_stock_rates['rates'],
+                "evening": evening_moex_stock_rates['rates'],
+                "weekend": weekend_moex_stock_rates['rates'],
+            }
+            self._logger.log("Writing to file... ", write_to_file, dictionaries_paths["stock_rates"], moex_stock_rates)
+            if not os.path.getsize(dictionaries_paths["stock_rates"]):
+                e = OSError("Requested data are empty")
+                self._logger.error(e)
+                raise e
 
         return list(dictionaries_paths.values())
 
@@ -2,11 +2,12 @@
 # coding=utf-8
 
 import os
-import urllib.request
 
 import openpyxl
 
 from DataGenerator import DataGenerator
+from lib.HttpCache import HttpCache
+from lib.LoggableRequester import LoggableRequester
 
 
 class NASDAQGIDSDataGenerator(DataGenerator):
@@ -16,15 +17,16 @@ class NASDAQGIDSDataGenerator(DataGenerator):
     __MY_CSV = "nasdaq_gids_symbols.csv"
     __URL = 'https://indexes.nasdaqomx.com/Index/ExportDirectory'
 
-    @staticmethod
-    def download_file(url: str, destination: str) -> None:
+    def download_file(self, url: str, destination: str) -> None:
         """
         Downloads a file from the specified URL and saves it to the destination.
 
         :param url: URL where the file is downloaded from
         :param destination: The path where the downloaded file will be saved
+        :raise DataGenerator.NotModified: If the file is the cached one
         """
-        urllib.request.urlretrieve(url, destination)
+        with LoggableRequester(self._logger, timeout=60) as requester:
+            self._check_modified(requester.download(url, destination, cache=HttpCache.active()).response, downloaded=[destination])
 
     @staticmethod
     def get_indices_from_xlsx(filename: str) -> list:
@@ -71,6 +73,8 @@ class NASDAQGIDSDataGenerator(DataGenerator):
             self.write_to_csv(self.__MY_CSV, self.get_indices_from_xlsx(self.__DESTINATION))
             os.remove(self.__DESTINATION)
             return [self.__MY_CSV]
+        except DataGenerator.NotModified as e:
+            raise e
         except Exception as e:
             self._logger.error(e)
             raise e
@@ -1,4 +1,5 @@
 from DataGenerator import DataGenerator
+from lib.HttpCache import HttpCache
 from lib.LoggableRequester import LoggableRequester
 from utils import get_headers, file_writer
 
@@ -11,7 +12,8 @@ class NASDAQTraderDataGenerator(DataGenerator):
 
         requester = LoggableRequester(self._logger, retries=5, delay=5)
         try:
-            resp = requester.request(LoggableRequester.Methods.GET, url, get_headers())
+            resp = requester.request(LoggableRequester.Methods.GET, url, get_headers(), cache=HttpCache.active())
+            self._check_modified(resp)
             file_writer(resp.text, descriptions)
             return [descriptions]
         except OSError as e:
@@ -4,11 +4,12 @@
 import csv
 import os
 import re
-import urllib.request
 
 import openpyxl
 
 from DataGenerator import DataGenerator
+from lib.HttpCache import HttpCache
+from lib.LoggableRequester import LoggableRequester
 
 
 class NyseDataGenerator(DataGenerator):
@@ -19,13 +20,14 @@ class NyseDataGenerator(DataGenerator):
     __MY_CSV = "symbolsNYSE.csv"
     __URL = 'https://www.nyse.com/publicdocs/nyse/symbols/Symbol_Distribution.xlsx'
 
-    @staticmethod
-    def _download_file(url: str, destination: str) -> None:
+    def _download_file(self, url: str, destination: str) -> None:
         """
         :param url: url where the file is downloaded from
         :param destination: the name of the file in which the downloaded file is saved
+        :raise DataGenerator.NotModified: if the file is the cached one
         """
-        urllib.request.urlretrieve(url, destination)
+        with LoggableRequester(self._logger, timeout=60) as requester:
+            self._check_modified(requester.download(url, destination, cache=HttpCache.active()).response, downloaded=[destination])
 
     @staticmethod
     def _xlsx_to_csv(source: str, destination: str) -> None:
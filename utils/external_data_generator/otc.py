@@ -1,9 +1,9 @@
 import asyncio
 import json
 
-import aiohttp
-
 from DataGenerator import DataGenerator
+from lib.AsyncLoggableRequester import AsyncLoggableRequester
+from lib.RateLimiter import RateLimiter
 from utils import get_headers, unpack_tar_gz_to_json, get_bucket_by_branch
 from s3_utils import read_state
 
@@ -31,16 +31,12 @@ class OtcDataGenerator(DataGenerator):
         return headers
 
     async def __request_all_records(self) -> list:
-        semaphore = asyncio.Semaphore(1)
-
-        async def limit_wrap(url, session):
-            async with semaphore:
-                return await self.__request_records(url, session)
-
-        async with aiohttp.ClientSession() as session:
+        # the source bans aggressive clients: one request at a time, at most 2 per second if it answers fast
+        async with AsyncLoggableRequester(self._logger, timeout=30, delay=5, limit_per_host=1,
+                                          rate_limiter=RateLimiter(rate=2)) as requester:
             records = []
             self._logger.info("Requesting first page of OTC data")
-            pages, first_records = await self.__request_records(self.__get_directory_url(1), session)
+            pages, first_records = await self.__request_records(self.__get_directory_url(1), requester)
             self._logger.info(f"Data is on {pages} pages")
             if pages is None:
                 pages = 1
@@ -48,31 +44,31 @@ class OtcDataGenerator(DataGenerator):
 
             urls = [self.__get_directory_url(page) for page in range(2, pages + 1)]
 
-            responses = [limit_wrap(url, session) for url in urls]
+            responses = [self.__request_records(url, requester) for url in urls]
             record_chunks = await asyncio.gather(*responses)
             for _, chunk in record_chunks:
                 records.extend([] if chunk is None else chunk)
             self._logger.info(f"Total loaded {len(records)} records")
             return records
 
-    async def __request_records(self, url: str, session: aiohttp.ClientSession):
+    async def __request_records(self, url: str, requester: AsyncLoggableRequester):
         headers = self.__get_headers()
         # self._logger.debug(f"{url} headers={headers}")
-        async with session.get(url, headers=headers) as response:
-            try:
-                # raw_data = await response.text()
-                # self._logger.debug(f"got response {response.status} {raw_data}")
-                data = await response.json()
-            except json.JSONDecodeError as e:
-                self._logger.error(f"Error decoding JSON for {url}: {e}")
-                return None, None
-
-            try:
-                self._logger.info(f"Loaded {len(data['records'])} records")
-                return data["pages"], data["records"]
-            except KeyError:
-                self._logger.info(f"No data {url}")
-                return None, None
+        response = await requester.request(AsyncLoggableRequester.Methods.GET, url, headers=headers)
+        try:
+            # raw_data = await response.text()
+            # self._logger.debug(f"got response {response.status} {raw_data}")
+            data = await response.json()
+        except json.JSONDecodeError as e:
+            self._logger.error(f"Error decoding JSON for {url}: {e}")
+            return None, None
+
+        try:
+            self._logger.info(f"Loaded {len(data['records'])} records")
+            return data["pages"], data["records"]
+        except KeyError:
+            self._logger.info(f"No data {url}")
+            return None, None
 
     @staticmethod
     def __merge(prev_records, new_records, field):
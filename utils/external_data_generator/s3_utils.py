@@ -16,9 +16,8 @@ def download_state(object_key: str) -> str:
     baseurl = "https://tradingview-sourcedata-storage.xtools.tv"
     url = f"{baseurl}/{object_key}"
     try:
-        resp = LoggableRequester().request(LoggableRequester.Methods.GET, url)
-        with open(tmp_file.name, "wb") as f:
-            f.write(resp.content)
+        with LoggableRequester(timeout=60) as requester:
+            requester.download(url, tmp_file.name)
     except OSError as e:
         raise e
     return tmp_file.name
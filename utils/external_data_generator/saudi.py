@@ -1,9 +1,8 @@
-import time
-
 from deepdiff.serialization import json_dumps
 
 from DataGenerator import DataGenerator
 from lib.LoggableRequester import LoggableRequester
+from lib.RateLimiter import RateLimiter
 from utils import file_writer
 
 
@@ -26,7 +25,10 @@ class SAUDIDataGenerator(DataGenerator):
         saudi_main_market = "saudi_main_market.json"
         saudi_nomu_parallel_market = "saudi_nomu_parallel_market.json"
 
-        requester = LoggableRequester(self._logger, retries=5, delay=10)
+        # the source bans frequent requests, one per 20 seconds is tolerated; the 20 seconds are counted from
+        # the start of the previous request (not from its response as the former sleep did), a slow response
+        # shortens the pause after it
+        requester = LoggableRequester(self._logger, retries=5, delay=10, rate_limiter=RateLimiter(rate=1 / 20))
         try:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:141.0) Gecko/20100101 Firefox/141.0',
@@ -53,8 +55,6 @@ class SAUDIDataGenerator(DataGenerator):
             })
             self._save_response(resp, saudi_main_market)
 
-            time.sleep(20)
-
             resp = requester.request(LoggableRequester.Methods.POST, url, headers, {
                 'sector': '',
                 'symbol': '',
@@ -7,26 +7,31 @@ IDC_TVC_HOST="$2"
 EXPCHAINS_BRANCH="$3"
 
 
+EXPCHAINS_REPO="git@git.xtools.tv:idc/idc-expchains.git"
+if [ -z "$EXPCHAINS_BRANCH" ]; then
+    EXPCHAINS_BRANCH=staging
+fi
+
+# the fetcher is a part of the expchains repo, as well as the generator
+EXP_CHAINS_DIR="./idc-expchains"
+
+if [ ! -d "$EXP_CHAINS_DIR" ]; then
+    echo "Clone branch ${EXPCHAINS_BRANCH} from repo ${EXPCHAINS_REPO}"
+    git clone --depth 1 --single-branch -b $EXPCHAINS_BRANCH "$EXPCHAINS_REPO" "$EXP_CHAINS_DIR"
+else
+    pushd "$EXP_CHAINS_DIR"
+    echo "Update branch ${EXPCHAINS_BRANCH} from repo ${EXPCHAINS_REPO}"
+    git fetch
+    git checkout $EXPCHAINS_BRANCH
+    git pull origin $EXPCHAINS_BRANCH
+    popd
+fi
+
 SYMBOLINFO_DIR="$DIR/symbolinfo"
+SYMBOLINFO_STATE="$SYMBOLINFO_DIR/.sha256.json"
+CHANGED_GROUPS="$DIR/changed_groups.txt"
 mkdir -p "$SYMBOLINFO_DIR"
-echo "Getting groups from $IDC_HOST"
-SI_GROUPS=$(curl -s "$IDC_HOST/meta/info.json" | jq -r  '.groups | keys | .[]' | grep '_futures$')
-while read -r SI_GROUP; do
-    echo "Getting $SI_GROUP"
-    curl -s "$IDC_HOST/symbol_info?group=$SI_GROUP" | jq . > "$SYMBOLINFO_DIR/$SI_GROUP.json"
-done <<< "$SI_GROUPS"
-
-echo "Getting groups from $IDC_TVC_HOST"
-SI_TVC_GROUPS="$(curl -s "$IDC_TVC_HOST/meta/info.json" | jq -r  '.groups | keys | .[]' | grep '_futures$' || true)"
-while read -r SI_TVC_GROUP; do
-    if [[ -z "$SI_TVC_GROUP" ]]; then
-        continue
-    fi
-    echo "Getting $SI_TVC_GROUP"
-    curl -s "$IDC_TVC_HOST/symbol_info?group=$SI_TVC_GROUP" | jq . > "$SYMBOLINFO_DIR/$SI_TVC_GROUP.json"
-done <<< "$SI_TVC_GROUPS"
-
-echo "Getting manual groups"
+
 SI_OTHER_GROUPS=(
   "moex_iss_futures"
   "alor_futures"
@@ -35,10 +40,13 @@ SI_OTHER_GROUPS=(
   "alor_rest_futures"
   "six_istanbul_futures"
   )
-for GROUP in "${SI_OTHER_GROUPS[@]}"; do
-    echo "Getting $GROUP"
-    curl -s "$IDC_HOST/symbol_info?group=$GROUP" | jq . > "$SYMBOLINFO_DIR/$GROUP.json"
-done <<< "${SI_OTHER_GROUPS[@]}"
+echo "Getting groups from $IDC_HOST and $IDC_TVC_HOST"
+PYTHONPATH="$EXP_CHAINS_DIR" python3 -m utils.store_expchains.symbolinfo_fetcher \
+    -s "$IDC_HOST" -s "$IDC_TVC_HOST" \
+    $(printf -- '-g %s ' "${SI_OTHER_GROUPS[@]}") \
+    -o "$SYMBOLINFO_DIR" --state "$SYMBOLINFO_STATE" --changed "$CHANGED_GROUPS"
 
 echo "Running update_expchains.sh"
-"${DIR}/update_expchains.sh" "$SYMBOLINFO_DIR" "$EXPCHAINS_BRANCH"
+"${DIR}/update_expchains.sh" "$SYMBOLINFO_DIR" "$EXPCHAINS_BRANCH" "$CHANGED_GROUPS"
+# the unchanged groups are skipped by the next run only after they have been processed
+mv "${SYMBOLINFO_STATE}.pending" "$SYMBOLINFO_STATE"
@@ -305,9 +305,23 @@ else
 fi
 
 cd ./idc-expchains
+# the manifest of the uploaded snapshot is compared first, so the snapshot is downloaded only if expchains have changed
+MANIFEST="expchains.manifest.json"
+REMOTE_MANIFEST="out/tvc/remote/$MANIFEST"
+python3 -m bin.expchains_generator manifest -p expchains -o "$MANIFEST"
+mkdir -p "${REMOTE_MANIFEST%/*}"
+if [ "$FORCE_UPLOAD" != '1' ] && download_snapshot "tvc/$MANIFEST" "$REMOTE_MANIFEST" && cmp -s "$MANIFEST" "$REMOTE_MANIFEST"; then
+  log_success "s3: expchains are not modified according to $MANIFEST"
+  exit 0
+fi
+
 # shellcheck disable=SC2046
 # shellcheck disable=SC2005
 FILES_TO_STORE=$(echo $(ls expchains/*))
 RETVAL=0
 s3_process_snapshot -i "$FILES_TO_STORE" -s "tvc/expchains.tar.gz" -f "$FORCE_UPLOAD" || RETVAL=$? && true
+if [ "$RETVAL" -eq 0 ]; then
+  log_info "Uploading $MANIFEST..."
+  aws s3 cp "$MANIFEST" "$BASE_URL/tvc/$MANIFEST" 2>&1 || RETVAL="$UNSTABLE_CODE"
+fi
 exit "$RETVAL"
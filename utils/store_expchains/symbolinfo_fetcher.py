@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# coding=utf-8
+import argparse
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional
+
+from lib.ConsoleOutput import ConsoleOutput
+from lib.LoggableRequester import LoggableRequester
+
+FUTURES_GROUP_SUFFIX = '_futures'
+CHUNK_SIZE = 1 << 16
+PENDING_SUFFIX = '.pending'
+
+
+class LineOutput(ConsoleOutput):
+    """
+    A logger shared by threads: the parts of a line are collected per thread and the line is printed
+    under a lock once complete, so the lines of concurrent downloads don't interleave.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        # protected non-static variables
+        self._lines = threading.local()
+        self._lock = threading.Lock()
+
+    def info(self, message: str, eol=True, color: ConsoleOutput.Foreground = ConsoleOutput.Foreground.RESET) -> None:
+        parts = getattr(self._lines, 'parts', None)
+        if parts is None:
+            parts = self._lines.parts = [f"[INFO] {self._name} - "]
+        parts.append(color + message + ConsoleOutput.Foreground.RESET if color else message)
+        if eol:
+            self._lines.parts = None
+            with self._lock:
+                print(''.join(parts), flush=True)
+
+    def warn(self, message: str) -> None:
+        with self._lock:
+            super().warn(message)
+
+    def error(self, exception: Exception | str) -> None:
+        with self._lock:
+            super().error(exception)
+
+
+def host_url(host: str) -> str:
+    return host if host.startswith(('http://', 'https://')) else 'http://' + host
+
+
+def get_groups(requester: LoggableRequester, host: str) -> list[str]:
+    """
+    Requests the futures groups of a host.
+    :param requester: a requester
+    :param host: an idc host (host:port or url)
+    :return: the futures group names
+    :raise RequestException: if failed to request the groups
+    """
+    response = requester.message(f"Getting groups from {host}... ").request(
+        LoggableRequester.Methods.GET, f"{host_url(host)}/meta/info.json")
+    return sorted(group for group in response.json()['groups'] if group.endswith(FUTURES_GROUP_SUFFIX))
+
+
+def fetch_group(requester: LoggableRequester, host: str, group: str, output_dir: str, digest: Optional[str]) -> str:
+    """
+    Streams the symbol_info of a group to <output_dir>/<group>.json as is, the file is replaced atomically
+    and only if its content has changed. A failure while reading the body is retried as a failed request.
+    :param requester: a requester, it may be shared by threads
+    :param host: an idc host (host:port or url)
+    :param group: a group name
+    :param output_dir: a symbol_info directory
+    :param digest: the sha256 of the previous symbol_info of the group
+    :return: the sha256 of the symbol_info
+    :raise RequestException: if failed to request the group
+    """
+    symbolinfo_file = os.path.join(output_dir, f"{group}.json")
+    # no message(), it's not thread-safe, the group is seen in the url of the default one
+    download = requester.download(f"{host_url(host)}/symbol_info?group={group}", symbolinfo_file + '.tmp',
+                                  hash_name='sha256', chunk_size=CHUNK_SIZE)
+    if download.digest == digest and os.path.exists(symbolinfo_file):
+        os.remove(symbolinfo_file + '.tmp')
+    else:
+        os.replace(symbolinfo_file + '.tmp', symbolinfo_file)
+    return download.digest
+
+
+def fetch(sources: Iterable[tuple[str, str]], output_dir: str, state_file: Optional[str] = None,
+          connections_per_host: int = 4, logger: ConsoleOutput = None) -> list[str]:
+    """
+    Downloads the symbol_info of groups concurrently, at most connections_per_host requests to a host at once.
+    The sha256 of the groups are compared with the state file, the new state is written to <state_file>.pending
+    to be committed (renamed to the state file) once the changed groups are processed.
+    :param sources: (host, group) pairs, a later host of a group wins
+    :param output_dir: a symbol_info directory
+    :param state_file: a JSON file mapping the groups to the sha256 of their symbol_info
+    :param connections_per_host: the limit of concurrent requests to a host
+    :param logger: a logger, a LineOutput (the default one) keeps the lines of the concurrent downloads whole
+    :return: the changed groups
+    :raise RequestException: if failed to request a group
+    """
+    logger = LineOutput('symbolinfo_fetcher') if logger is None else logger
+    hosts = dict((group, host) for host, group in sources)
+    state = {}
+    if state_file:
+        try:
+            with open(state_file, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            pass  # the first run
+    os.makedirs(output_dir, exist_ok=True)
+    semaphores = {host: threading.Semaphore(connections_per_host) for host in set(hosts.values())}
+    # a requester per host keeps its connections alive between the groups
+    requesters = {host: LoggableRequester(logger, timeout=60, pool_connections=1, pool_maxsize=connections_per_host)
+                  for host in semaphores}
+
+    def fetch_limited(group: str) -> str:
+        with semaphores[hosts[group]]:
+            try:
+                return fetch_group(requesters[hosts[group]], hosts[group], group, output_dir, state.get(group))
+            except Exception as e:
+                logger.error(f"Failed to fetch {group} from {hosts[group]}: {e}")
+                raise
+
+    try:
+        with ThreadPoolExecutor(max_workers=connections_per_host * len(semaphores) or 1) as executor:
+            digests = dict(zip(hosts, executor.map(fetch_limited, hosts)))
+    finally:
+        for requester in requesters.values():
+            requester.close()
+    changed = sorted(group for group, digest in digests.items() if digest != state.get(group))
+    logger.info(f"{len(changed)} of {len(digests)} groups have changed")
+    if state_file:
+        with open(state_file + PENDING_SUFFIX, 'w') as f:
+            json.dump({**state, **digests}, f, indent=2, sort_keys=True)
+    return changed
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-s', '--host', dest='hosts', type=str, metavar='<host>', action='append', default=[],
+                        help='idc host to get all futures groups from, may be repeated (a later host wins)')
+    parser.add_argument('-g', '--group', dest='groups', type=str, metavar='<group>', action='append', default=[],
+                        help='a group to get from the first host besides the futures groups, may be repeated')
+    parser.add_argument('-o', '--out', dest='output_dir', type=str, metavar='<symbolinfo-dir>',
+                        help='symbol_info directory', required=True)
+    parser.add_argument('--state', dest='state_file', type=str, metavar='<state>',
+                        help='JSON file of the sha256 of the groups of the last run, the new state is written to '
+                             '<state>.pending')
+    parser.add_argument('--changed', dest='changed_file', type=str, metavar='<changed>',
+                        help='file to write the names of the changed groups to, one per line')
+    parser.add_argument('-l', '--limit', dest='limit', type=int, metavar='<limit>', default=4,
+                        help='number of concurrent requests to a host (default: 4)')
+    return parser.parse_args()
+
+
+def main(args):
+    logger = LineOutput('symbolinfo_fetcher')
+    sources = []
+    with LoggableRequester(logger) as requester:
+        for host in args.hosts:
+            try:
+                sources.extend((host, group) for group in get_groups(requester, host))
+            except Exception as e:
+                if host == args.hosts[0]:
+                    raise
+                logger.warn(f"No groups from {host}: {e}")  # as the curl loop, only the main host is required
+    if args.hosts:
+        sources.extend((args.hosts[0], group) for group in args.groups)
+    changed = fetch(sources, args.output_dir, args.state_file, args.limit, logger)
+    if args.changed_file:
+        with open(args.changed_file, 'w') as f:
+            f.writelines(f"{group}\n" for group in changed)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(parse_args()))
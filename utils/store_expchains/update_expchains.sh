@@ -9,6 +9,8 @@ fi
 
 SYMBOLINFO_DIR="$1"
 EXPCHAINS_BRANCH="$2"
+# optional, a file of the groups to update, one per line (all groups of the symbolinfo dir by default)
+GROUPS_FILE="$3"
 
 if [ -z "$EXPCHAINS_BRANCH" ]; then
     EXPCHAINS_BRANCH=staging
@@ -21,7 +23,11 @@ else
 	echo "WARNING: Files will be uploaded to production storage"
 fi
 
-LIST=$(find "${SYMBOLINFO_DIR}" -name '*_futures.json' -printf '%f ')
+if [ -n "$GROUPS_FILE" ]; then
+    LIST=$(sed -n 's/_futures$/_futures.json/p' "$GROUPS_FILE" | tr '\n' ' ')
+else
+    LIST=$(find "${SYMBOLINFO_DIR}" -name '*_futures.json' -printf '%f ')
+fi
 
 if [ -z "$LIST" ]; then
     echo "No futures groups to update expchains"
@@ -29,6 +35,8 @@ if [ -z "$LIST" ]; then
 fi
 
 EXP_CHAINS_DIR="./idc-expchains"
+# outside of the repo, the validation results of the unchanged expchains are reused by the next runs
+VALIDATION_CACHE="$(pwd)/expchains.validation.json"
 
 if [ ! -d "$EXP_CHAINS_DIR" ]; then
     echo "Clone branch ${EXPCHAINS_BRANCH} from repo ${EXPCHAINS_REPO}"
@@ -46,14 +54,17 @@ mkdir -p "${EXP_CHAINS_DIR}/expchains/"
 for file in $LIST; do
     expchains_file="${file%.json}.csv"
     echo "Generate expchains ${expchains_file}"
-    ruby "${EXP_CHAINS_DIR}/bin/expchains.rb" generate \
+    PYTHONPATH="$EXP_CHAINS_DIR" python3 -m bin.expchains_generator generate \
         -s "${SYMBOLINFO_DIR}/$file" \
         -e "${EXP_CHAINS_DIR}/expchains/$expchains_file" \
         -m "${EXP_CHAINS_DIR}/expchains/$expchains_file"
 done
 
 pushd "$EXP_CHAINS_DIR"
-git add "expchains/*"
+echo "Validate expchains"
+python3 -m bin.expchains_generator validate -p expchains --cache "$VALIDATION_CACHE"
+python3 -m bin.expchains_generator manifest -p expchains
+git add "expchains/*" expchains.manifest.json
 if [ "$(git status -s)" = "" ]; then
     echo "No changes in $EXPCHAINS_BRANCH"
 else